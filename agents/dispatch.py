@@ -0,0 +1,299 @@
+"""
+Domain-routed, concurrent agent evaluation.
+
+Each agent only sees findings whose category falls in one of its declared
+domains. Agents run concurrently with a per-agent timeout, and a quorum
+policy stops waiting as soon as the overall outcome is decided.
+
+Agents run on one bounded pool of daemon threads shared by every dispatcher
+in the process, so creating orchestrators does not accumulate threads and an
+agent that hangs never blocks interpreter exit. An agent still running from a
+timed-out call is not called again until it returns; it counts as timed out.
+
+approvals only holds the agents that voted: agents with no finding in their
+domains are listed in abstained, and agents whose vote was no longer needed
+once the quorum was decided (e.g. after the first reject under "all") in skipped.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field, replace
+
+from core.metrics import counter, histogram
+
+# Finding categories relevant to each agent domain. Findings whose category
+# is not listed anywhere (including non-dict findings) go to every agent.
+DOMAIN_CATEGORIES = {
+    "architecture": {"structure", "type"},
+    "observability": {"structure", "logging"},
+    "CI": {"lint", "type", "auto_generated"},
+    "rollout": {"auto_generated"},
+    "UX": {"boundary"},
+    "boundary": {"boundary"},
+    "repro": {"fuzz", "crash"},
+    "causality": {"fuzz", "crash", "auto_generated"},
+    "security": {"boundary", "fuzz", "crash"},
+    "memory safety": {"fuzz", "crash"},
+    "performance": {"perf", "performance"},
+    "resilience": {"chaos"},
+}
+
+_ROUTED_CATEGORIES = set().union(*DOMAIN_CATEGORIES.values())
+SEVERITY_ORDER = ["info", "low", "medium", "high", "critical"]
+
+DEFAULT_AGENT_TIMEOUT = 30.0
+# Threads in the shared agent pool
+MAX_AGENT_WORKERS = 32
+
+AGENT_VERDICTS = counter("hexprobe_agent_verdicts_total",
+                         "Agent verdicts (approve, reject, error, timeout, abstain, skipped)", ("agent", "verdict"))
+AGENT_SECONDS = histogram("hexprobe_agent_seconds", "Agent evaluation time", ("agent",))
+
+
+def _category(finding):
+    if isinstance(finding, dict):
+        return finding.get("category")
+    return None
+
+
+def quorum_threshold(quorum, voters):
+    """
+    Number of approvals needed: "all", "majority", "any" or an explicit count.
+    """
+    if quorum == "all":
+        return voters
+    if quorum == "majority":
+        return voters // 2 + 1
+    if quorum == "any":
+        return min(1, voters)
+    return min(int(quorum), voters)
+
+
+def decide(quorum, approvals, pending, voters):
+    """
+    Returns True/False once the outcome is fixed, or None while it is still open.
+    """
+    needed = quorum_threshold(quorum, voters)
+    approved = sum(1 for verdict in approvals.values() if verdict)
+    if approved >= needed:
+        return True
+    if approved + pending < needed:
+        return False
+    return None
+
+
+class _RoutedFindings:
+    """
+    Lazy, re-iterable view of the findings routed to one agent, used when
+    findings are not an in-memory list (e.g. spilled to disk)
+    """
+    def __init__(self, findings, categories):
+        self._findings = findings
+        self._categories = categories
+
+    def __iter__(self):
+        for finding in self._findings:
+            if _category(finding) not in _ROUTED_CATEGORIES or _category(finding) in self._categories:
+                yield finding
+
+    def __bool__(self):
+        return any(True for _ in self)
+
+
+class _AgentPool:
+    """
+    Up to max_workers daemon worker threads, started only when no worker is idle
+    """
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._workers = []
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        future = Future()
+        self._queue.put((future, func, args))
+        if self._idle.acquire(blocking=False):
+            return future
+        with self._lock:
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"hexprobe-agent-{len(self._workers)}",
+                                          daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        return future
+
+    def _work(self):
+        while True:
+            future, func, args = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(func(*args))
+                except BaseException as exc:
+                    future.set_exception(exc)
+            self._idle.release()
+
+
+_pool = _AgentPool(MAX_AGENT_WORKERS)
+# Agents (shared instances) with a call still running, across all dispatchers
+_running = set()
+_running_lock = threading.Lock()
+
+
+def _release(agent):
+    with _running_lock:
+        _running.discard(agent)
+
+
+@dataclass
+class DispatchResult:
+    approvals: dict
+    approved: bool
+    abstained: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+
+
+class AgentDispatcher:
+    def __init__(self, agents, quorum="all", timeout=DEFAULT_AGENT_TIMEOUT):
+        self.agents = list(agents)
+        self.quorum = quorum
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def route(self, payload):
+        """
+        Returns (agent, payload restricted to the agent's domains) for every agent
+        with something to look at. With no findings at all, every agent sees the payload.
+        """
+        findings = payload.findings
+        if not findings:
+            return [(agent, payload) for agent in self.agents]
+
+        routed = []
+        for agent in self.agents:
+            categories = set().union(*(DOMAIN_CATEGORIES.get(d, ()) for d in getattr(agent, "domains", ())))
+            subset = _RoutedFindings(findings, categories)
+            if isinstance(findings, list):
+                subset = list(subset)
+            if subset:
+                routed.append((agent, replace(payload, findings=subset, severity=self._severity(subset, payload))))
+        return routed
+
+    @staticmethod
+    def _severity(findings, payload):
+        highest = None
+        for finding in findings:
+            severity = finding.get("severity") if isinstance(finding, dict) else None
+            if severity not in SEVERITY_ORDER:
+                return payload.severity
+            if highest is None or SEVERITY_ORDER.index(severity) > SEVERITY_ORDER.index(highest):
+                highest = severity
+        return highest
+
+    def _call(self, agent, payload, timing):
+        start = timing["started"] = time.monotonic()
+        try:
+            verdict, outcome = bool(agent.approve(payload)), None
+        except Exception:
+            verdict, outcome = False, "error"
+        finally:
+            _release(agent)
+        return verdict, outcome, time.monotonic() - start
+
+    def _submit(self, agent, payload):
+        """
+        Start an agent call and return (future, timing), or None while the
+        agent's previous call is still running
+        """
+        with _running_lock:
+            if agent in _running:
+                return None
+            _running.add(agent)
+        timing = {"submitted": time.monotonic()}
+        return _pool.submit(self._call, agent, payload, timing), timing
+
+    def _deadline(self, timing):
+        # Each agent's timeout runs from when it starts; one still queued times out timeout after submission
+        return max(timing.get("started", 0.0), timing["submitted"]) + self.timeout
+
+    @staticmethod
+    def _cancel(future, agent):
+        if future.cancel():
+            _release(agent)
+
+    def _record(self, name, outcome, elapsed=None):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                "approve": 0, "reject": 0, "error": 0, "timeout": 0, "abstain": 0, "skipped": 0,
+            })
+            stats[outcome] += 1
+            if elapsed is not None:
+                stats["calls"] += 1
+                stats["total_seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        AGENT_VERDICTS.inc(agent=name, verdict=outcome)
+        if elapsed is not None:
+            AGENT_SECONDS.observe(elapsed, agent=name)
+
+    def stats(self):
+        """
+        Per-agent latency and verdict counts accumulated over all dispatches
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def dispatch(self, payload):
+        routed = self.route(payload)
+        routed_names = {agent.name for agent, _ in routed}
+        abstained = [agent.name for agent in self.agents if agent.name not in routed_names]
+        for name in abstained:
+            self._record(name, "abstain")
+
+        futures = {}
+        timings = {}
+        votes = {}
+        for agent, sub in routed:
+            submitted = self._submit(agent, sub)
+            if submitted is None:
+                votes[agent.name] = False
+                self._record(agent.name, "timeout")
+                continue
+            future, timings[future] = submitted
+            futures[future] = agent
+        pending = set(futures)
+        outcome = decide(self.quorum, votes, len(pending), len(routed))
+        while pending and outcome is None:
+            now = time.monotonic()
+            expired = {future for future in pending if self._deadline(timings[future]) <= now}
+            for future in expired:
+                self._cancel(future, futures[future])
+                votes[futures[future].name] = False
+                self._record(futures[future].name, "timeout")
+            pending -= expired
+            outcome = decide(self.quorum, votes, len(pending), len(routed))
+            if not pending or outcome is not None:
+                break
+            next_deadline = min(self._deadline(timings[future]) for future in pending)
+            done, pending = wait(pending, timeout=max(next_deadline - time.monotonic(), 0),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                verdict, error, elapsed = future.result()
+                name = futures[future].name
+                votes[name] = verdict
+                self._record(name, error or ("approve" if verdict else "reject"), elapsed)
+            outcome = decide(self.quorum, votes, len(pending), len(routed))
+
+        skipped = []
+        for future in pending:
+            self._cancel(future, futures[future])
+            skipped.append(futures[future].name)
+            self._record(futures[future].name, "skipped")
+        if outcome is None:
+            outcome = decide(self.quorum, votes, 0, len(routed))
+
+        approvals = {agent.name: votes[agent.name] for agent in self.agents if agent.name in votes}
+        return DispatchResult(approvals=approvals, approved=outcome, abstained=abstained, skipped=skipped)
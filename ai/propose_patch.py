@@ -1,12 +1,24 @@
+from collections import OrderedDict
 from datetime import datetime
+import re
 import uuid
 
+# Upper bound on distinct synthesized patches kept in memory
+PATCH_CACHE_SIZE = 1024
+
+# Quoted literals, hex and decimal numbers vary between otherwise identical messages
+_VARIABLE_TOKENS = re.compile(r"'[^']*'|\"[^\"]*\"|\b0x[0-9a-fA-F]+\b|\b\d+\b")
+
+_patch_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
 class ProposedPatch:
-    def __init__(self, description, code_snippet, rationale):
+    def __init__(self, description, code_snippet, rationale, findings=None):
         self.id = str(uuid.uuid4())
         self.description = description
         self.code_snippet = code_snippet
         self.rationale = rationale
+        self.findings = findings if findings is not None else []
         self.created_at = datetime.utcnow()
 
 def synthesize_patch(finding, context=None):
@@ -31,3 +43,60 @@ def synthesize_patch(finding, context=None):
     return ProposedPatch(description=finding["message"],
                          code_snippet=code_snippet,
                          rationale=rationale)
+
+def finding_key(finding):
+    """
+    Normalized grouping key: findings with the same key get the same patch.
+    """
+    template = _VARIABLE_TOKENS.sub("<*>", str(finding.get("message", "")))
+    return (finding.get("category"), template, finding.get("rule"))
+
+def _cached_synthesis(key, finding, context):
+    try:
+        cache_key = (key, context)
+        hash(cache_key)
+    except TypeError:
+        # Unhashable context: synthesize without caching
+        return synthesize_patch(finding, context=context)
+
+    cached = _patch_cache.get(cache_key)
+    if cached is not None:
+        _patch_cache.move_to_end(cache_key)
+        _cache_stats["hits"] += 1
+        return cached
+
+    _cache_stats["misses"] += 1
+    patch = synthesize_patch(finding, context=context)
+    _patch_cache[cache_key] = patch
+    if len(_patch_cache) > PATCH_CACHE_SIZE:
+        _patch_cache.popitem(last=False)
+    return patch
+
+def synthesize_patches(findings, context=None, new_list=list):
+    """
+    Groups findings by finding_key and synthesizes one patch per group.
+    Each returned patch lists the findings it covers in patch.findings.
+    new_list creates the returned sequences (e.g. disk-spilling lists).
+    """
+    groups = OrderedDict()
+    for finding in findings:
+        key = finding_key(finding)
+        if key not in groups:
+            groups[key] = (finding, new_list())
+        groups[key][1].append(finding)
+
+    patches = new_list()
+    for key, (first, covered) in groups.items():
+        template = _cached_synthesis(key, first, context)
+        patches.append(ProposedPatch(description=first["message"],
+                                     code_snippet=template.code_snippet,
+                                     rationale=template.rationale,
+                                     findings=covered))
+    return patches
+
+def patch_cache_info():
+    return {"size": len(_patch_cache), "max_size": PATCH_CACHE_SIZE, **_cache_stats}
+
+def clear_patch_cache():
+    _patch_cache.clear()
+    _cache_stats.update(hits=0, misses=0)
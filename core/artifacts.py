@@ -0,0 +1,244 @@
+"""
+Content-addressed artifact store for probes.
+
+Blobs live under ``<data dir>/artifacts/blobs`` named by their SHA-256, so
+identical crash inputs or baselines are stored once. Named entries map a
+(namespace, name) pair to one or more blobs; the namespace is normally the
+audited repository. A small SQLite index tracks sizes and last access, and
+the store evicts least-recently-used blobs once it grows past max_bytes.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from core.storage import connect, get_data_dir
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+CHUNK_SIZE = 1024 * 1024
+
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            size INTEGER,
+            created_at TEXT,
+            last_access TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access)",
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            namespace TEXT,
+            name TEXT,
+            kind TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (namespace, name)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS entry_blobs (
+            namespace TEXT,
+            name TEXT,
+            position INTEGER,
+            digest TEXT,
+            label TEXT,
+            PRIMARY KEY (namespace, name, position)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_entry_blobs_digest ON entry_blobs (digest)",
+    ],
+]
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+class ArtifactStore:
+    """
+    Probe-facing artifact store: store(name, value) and get(name).
+
+    - lists of file paths (e.g. fuzz crash inputs) are stored as one blob per file
+      and read back as a list of blob paths
+    - bytes are stored as a single blob
+    - anything else is stored as JSON (e.g. perf baselines)
+    """
+    def __init__(self, namespace="default", root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.namespace = str(namespace)
+        self.root = Path(root) if root else get_data_dir() / "artifacts"
+        self.blob_dir = self.root / "blobs"
+        self.max_bytes = max_bytes
+
+    def _conn(self):
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        return connect(self.root / "index.db", MIGRATIONS)
+
+    def blob_path(self, digest):
+        return self.blob_dir / digest[:2] / digest
+
+    # -- blobs ---------------------------------------------------------------
+
+    def put_stream(self, stream):
+        """
+        Stream a binary file object into the store and return its digest.
+        Content already present is not written again.
+        """
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.blob_dir, prefix=".incoming-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+            target = self.blob_path(digest)
+            if target.exists():
+                os.unlink(tmp_name)
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(tmp_name, target)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        now = _now()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO blobs (digest, size, created_at, last_access) VALUES (?,?,?,?) "
+                "ON CONFLICT(digest) DO UPDATE SET last_access=excluded.last_access",
+                (digest, size, now, now),
+            )
+        return digest
+
+    def put_file(self, path):
+        with open(path, "rb") as handle:
+            return self.put_stream(handle)
+
+    def put_bytes(self, data):
+        fd, tmp_name = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "w+b") as tmp:
+                tmp.write(data)
+                tmp.seek(0)
+                return self.put_stream(tmp)
+        finally:
+            os.unlink(tmp_name)
+
+    def open_blob(self, digest):
+        """
+        Memory-map a blob read-only. Empty blobs are returned as b"".
+        """
+        path = self.blob_path(digest)
+        self._touch([digest])
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _touch(self, digests):
+        with self._conn() as conn:
+            conn.executemany("UPDATE blobs SET last_access=? WHERE digest=?", [(_now(), d) for d in digests])
+
+    # -- named entries -------------------------------------------------------
+
+    def _put_entry(self, name, kind, blobs):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, name, kind, updated_at) VALUES (?,?,?,?)",
+                (self.namespace, name, kind, _now()),
+            )
+            conn.execute("DELETE FROM entry_blobs WHERE namespace=? AND name=?", (self.namespace, name))
+            conn.executemany(
+                "INSERT INTO entry_blobs (namespace, name, position, digest, label) VALUES (?,?,?,?,?)",
+                [(self.namespace, name, i, digest, label) for i, (digest, label) in enumerate(blobs)],
+            )
+
+    def store(self, name, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            kind, blobs = "bytes", [(self.put_bytes(bytes(value)), None)]
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(v, Path) for v in value):
+            kind, blobs = "files", [(self.put_file(path), path.name) for path in value]
+        else:
+            kind, blobs = "json", [(self.put_bytes(json.dumps(value, default=str).encode("utf-8")), None)]
+        self._put_entry(name, kind, blobs)
+        self.evict()
+
+    def get(self, name, default=None):
+        with self._conn() as conn:
+            entry = conn.execute(
+                "SELECT kind FROM entries WHERE namespace=? AND name=?", (self.namespace, name)
+            ).fetchone()
+            digests = [row[0] for row in conn.execute(
+                "SELECT digest FROM entry_blobs WHERE namespace=? AND name=? ORDER BY position",
+                (self.namespace, name),
+            )]
+        if entry is None:
+            return default
+        kind = entry[0]
+        if kind == "files":
+            self._touch(digests)
+            return [self.blob_path(digest) for digest in digests]
+        data = self.open_blob(digests[0])
+        try:
+            if kind == "bytes":
+                return bytes(data)
+            return json.loads(bytes(data))
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    def delete(self, name):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries WHERE namespace=? AND name=?", (self.namespace, name))
+            conn.execute("DELETE FROM entry_blobs WHERE namespace=? AND name=?", (self.namespace, name))
+
+    # -- eviction ------------------------------------------------------------
+
+    def total_bytes(self):
+        with self._conn() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """
+        Remove least-recently-used blobs until the store fits in max_bytes.
+        Entries referencing an evicted blob are dropped with it. Returns bytes freed.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        freed = 0
+        with self._conn() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= limit:
+                return 0
+            victims = []
+            for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY last_access"):
+                if total - freed <= limit:
+                    break
+                victims.append((digest,))
+                freed += size
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS evicted (digest TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM evicted")
+            conn.executemany("INSERT INTO evicted (digest) VALUES (?)", victims)
+            conn.execute(
+                "DELETE FROM entries WHERE (namespace, name) IN ("
+                "SELECT namespace, name FROM entry_blobs WHERE digest IN (SELECT digest FROM evicted))"
+            )
+            conn.execute(
+                "DELETE FROM entry_blobs WHERE (namespace, name) NOT IN (SELECT namespace, name FROM entries)"
+            )
+            conn.execute("DELETE FROM blobs WHERE digest IN (SELECT digest FROM evicted)")
+            conn.execute("DELETE FROM evicted")
+        for (digest,) in victims:
+            try:
+                self.blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+        return freed
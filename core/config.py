@@ -0,0 +1,58 @@
+"""
+Pipeline configuration (hexprobe.yaml).
+
+Reading the file needs PyYAML, which is only imported when a config is loaded.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+CONFIG_FILENAME = "hexprobe.yaml"
+# Configuration shipped with HexProbe, used when the audited repo has none
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / CONFIG_FILENAME
+
+
+@dataclass(frozen=True)
+class StageConfig:
+    name: str
+    stage: str
+    fail_on: str = "high"
+    # Run time for stages that accept ctx["timeout"]; min_timeout marks them as cuttable to fit a budget
+    timeout: float | None = None
+    min_timeout: float | None = None
+
+
+def find_config(repo=None):
+    """
+    HEXPROBE_CONFIG, else <repo>/hexprobe.yaml, else the bundled default
+    """
+    if os.getenv("HEXPROBE_CONFIG"):
+        return Path(os.environ["HEXPROBE_CONFIG"])
+    if repo is not None and (Path(repo) / CONFIG_FILENAME).exists():
+        return Path(repo) / CONFIG_FILENAME
+    return DEFAULT_CONFIG_PATH
+
+
+def load_config(path=None):
+    try:
+        import yaml
+    except ImportError as exc:
+        raise RuntimeError("reading hexprobe.yaml requires PyYAML (pip install pyyaml)") from exc
+    with open(path or DEFAULT_CONFIG_PATH, encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+def load_pipeline(path=None):
+    """
+    The pipeline stages of a config file, in file order
+    """
+    stages = []
+    for entry in load_config(path).get("pipeline") or []:
+        stages.append(StageConfig(
+            name=entry.get("name") or entry["stage"].rsplit(".", 1)[-1],
+            stage=entry["stage"],
+            fail_on=entry.get("fail_on", "high"),
+            timeout=entry.get("timeout"),
+            min_timeout=entry.get("min_timeout"),
+        ))
+    return stages
@@ -0,0 +1,189 @@
+"""
+Warm-start HexProbe daemon.
+
+Keeps the orchestrator, agents, probe modules and database connections
+loaded in one long-running process and accepts audit jobs over a Unix
+domain socket. Results are streamed back as newline-delimited JSON.
+
+    python -m core.daemon serve
+    python -m core.daemon audit /path/to/repo --probe static.surface_sweep
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+from core.metrics import start_exporter
+from core.report import serialize_patch
+from core.storage import enable_persistent_connections, get_data_dir
+from probes.registry import load_probe
+
+DEFAULT_PROBE = "static.surface_sweep"
+
+
+def default_socket_path() -> Path:
+    return Path(os.getenv("HEXPROBE_SOCKET", get_data_dir() / "hexprobe.sock"))
+
+
+def _encode(message) -> bytes:
+    return (json.dumps(message, default=str) + "\n").encode("utf-8")
+
+
+class _AuditHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            job = json.loads(line)
+        except ValueError as exc:
+            self._send({"type": "error", "error": f"invalid job: {exc}"})
+            return
+
+        action = job.get("action", "audit")
+        if action == "ping":
+            self._send({"type": "pong", "pid": os.getpid(), "jobs": self.server.jobs_served})
+        elif action == "shutdown":
+            self._send({"type": "bye"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif action == "audit":
+            self._run_audit(job)
+        else:
+            self._send({"type": "error", "error": f"unknown action: {action}"})
+
+    def _send(self, message):
+        self.wfile.write(_encode(message))
+
+    def _run_audit(self, job):
+        server = self.server
+        start = time.monotonic()
+        try:
+            probe_func = load_probe(job.get("probe", DEFAULT_PROBE))
+            result = server.orchestrator.run_full_cycle(probe_func, job["repo"])
+        except Exception as exc:
+            self._send({"type": "error", "error": str(exc)})
+            return
+        finally:
+            server.jobs_served += 1
+
+        result_payload = result["result"]
+        for finding in result_payload.findings:
+            self._send({"type": "finding", "finding": finding})
+        self._send({"type": "approvals", "approvals": result["approvals"], "approved": result["approved"],
+                    "abstained": result["abstained"], "skipped": result["skipped"]})
+        for patch in result["patches"]:
+            self._send({"type": "patch", "patch": serialize_patch(patch)})
+        self._send({
+            "type": "done",
+            "severity": result_payload.severity,
+            "repro": result_payload.repro,
+            "elapsed_seconds": round(time.monotonic() - start, 3),
+        })
+
+
+class HexProbeDaemon(socketserver.UnixStreamServer):
+    """
+    Unix socket server that runs audit jobs one at a time against a warm orchestrator.
+    Jobs are serialized so cached SQLite connections are never shared across threads.
+    """
+    def __init__(self, socket_path=None):
+        self.socket_path = Path(socket_path or default_socket_path())
+        _remove_stale_socket(self.socket_path)
+        enable_persistent_connections()
+
+        from core.synthesis import HexProbeOrchestrator
+
+        self.orchestrator = HexProbeOrchestrator()
+        self.jobs_served = 0
+        super().__init__(str(self.socket_path), _AuditHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: Path):
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+            return
+    raise RuntimeError(f"HexProbe daemon already listening on {socket_path}")
+
+
+def serve(socket_path=None):
+    """
+    Start the daemon and block until it receives a shutdown request.
+    """
+    with HexProbeDaemon(socket_path) as server:
+        server.serve_forever()
+
+
+def request(job, socket_path=None):
+    """
+    Send a job to a running daemon and yield each streamed message.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path or default_socket_path()))
+        sock.sendall(_encode(job))
+        with sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                yield json.loads(line)
+
+
+def submit_audit(repo, probe=DEFAULT_PROBE, socket_path=None):
+    """
+    Submit an audit job and yield findings, approvals, patches and a final "done" message.
+    """
+    job = {"action": "audit", "repo": str(Path(repo).resolve()), "probe": probe}
+    yield from request(job, socket_path=socket_path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.daemon", description="HexProbe warm-start daemon")
+    parser.add_argument("--socket", help="Unix socket path (default: $HEXPROBE_SOCKET or <data dir>/hexprobe.sock)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="run the daemon in the foreground")
+    audit = commands.add_parser("audit", help="submit an audit job and stream results as NDJSON")
+    audit.add_argument("repo")
+    audit.add_argument("--probe", default=DEFAULT_PROBE)
+    commands.add_parser("ping", help="check that the daemon is running")
+    commands.add_parser("stop", help="ask the daemon to shut down")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        start_exporter()
+        serve(args.socket)
+        return 0
+
+    if args.command == "audit":
+        messages = submit_audit(args.repo, probe=args.probe, socket_path=args.socket)
+    else:
+        action = "ping" if args.command == "ping" else "shutdown"
+        messages = request({"action": action}, socket_path=args.socket)
+
+    status = 0
+    try:
+        for message in messages:
+            print(json.dumps(message, default=str), flush=True)
+            if message["type"] == "error":
+                status = 1
+    except (ConnectionRefusedError, FileNotFoundError):
+        print("HexProbe daemon is not running", file=sys.stderr)
+        return 2
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
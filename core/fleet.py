@@ -0,0 +1,234 @@
+"""
+Fleet mode: audit many repositories in parallel.
+
+Probe cycles run across a process pool. Knowledge and global-memory writes
+from every worker are funnelled through a single writer process that
+batches them, so SQLite sees one writer regardless of pool size. Batches
+the writer fails to store are counted in the report totals, and a writer
+that dies fails the run.
+
+    python -m core.fleet repos.txt --probe static.surface_sweep --workers 8 --output fleet.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from queue import Empty
+
+DEFAULT_PROBES = ("static.surface_sweep",)
+WRITER_BATCH_SIZE = 500
+WRITER_FLUSH_SECONDS = 1.0
+# Distinct write errors kept for the report
+MAX_WRITE_ERRORS = 10
+
+_write_queue = None
+
+
+def load_manifest(path):
+    """
+    Read a manifest with one repository path per line. Blank lines and
+    "#" comments are ignored; relative paths resolve against the manifest's directory.
+    """
+    manifest = Path(path)
+    repos = []
+    for line in manifest.read_text(encoding="utf-8").splitlines():
+        entry = line.split("#", 1)[0].strip()
+        if entry:
+            repos.append(str((manifest.parent / entry).resolve()))
+    return repos
+
+
+def _flush(patterns, probe_infos, runs):
+    from knowledge.history import store_run
+    from knowledge.learn import record_patterns
+    from memory.promote import promote_patterns, promote_probe_lineages
+
+    if patterns:
+        record_patterns(patterns)
+        promote_patterns(patterns)
+        promote_probe_lineages(probe_infos)
+    for run in runs:
+        store_run(run)
+
+
+def memory_writer(queue, status=None, batch_size=WRITER_BATCH_SIZE, flush_seconds=WRITER_FLUSH_SECONDS):
+    """
+    Writer process loop: drain ("memory", records) and ("history", run) messages
+    from queue and write them in bulk until a None sentinel arrives.
+    A batch that fails to write is dropped and counted, and writing carries on;
+    the counts are put on status (a queue) when the loop ends.
+    """
+    writes = {"failed_batches": 0, "dropped_records": 0, "errors": []}
+    patterns, probe_infos, runs = [], [], []
+    last_flush = time.monotonic()
+    done = False
+    while not done:
+        try:
+            message = queue.get(timeout=flush_seconds)
+        except Empty:
+            message = ("memory", [])
+        if message is None:
+            done = True
+        elif message[0] == "history":
+            runs.append(message[1])
+        else:
+            for pattern, probe_info in message[1]:
+                patterns.append(pattern)
+                probe_infos.append(probe_info)
+
+        pending = len(patterns) + len(runs)
+        due = time.monotonic() - last_flush >= flush_seconds
+        if pending and (done or due or pending >= batch_size):
+            try:
+                _flush(patterns, probe_infos, runs)
+            except Exception as exc:
+                writes["failed_batches"] += 1
+                writes["dropped_records"] += pending
+                error = f"{type(exc).__name__}: {exc}"
+                if error not in writes["errors"] and len(writes["errors"]) < MAX_WRITE_ERRORS:
+                    writes["errors"].append(error)
+            patterns, probe_infos, runs = [], [], []
+            last_flush = time.monotonic()
+    if status is not None:
+        status.put(writes)
+
+
+def _init_worker(queue):
+    global _write_queue
+    _write_queue = queue
+
+
+def _enqueue_records(records):
+    if records:
+        _write_queue.put(("memory", records))
+
+
+def _enqueue_run(run):
+    _write_queue.put(("history", run))
+
+
+def audit_repo(repo, probe_keys=DEFAULT_PROBES):
+    """
+    Run every probe against one repository and return a compact summary.
+    Executed inside pool workers; memory writes go to the fleet writer.
+    """
+    from core.synthesis import HexProbeOrchestrator
+    from probes.registry import load_probe
+
+    orchestrator = HexProbeOrchestrator()
+    summary = {"repo": repo, "probes": {}}
+    for key in probe_keys:
+        start = time.monotonic()
+        try:
+            result = orchestrator.run_full_cycle(load_probe(key), repo, memory_sink=_enqueue_records,
+                                                 history_sink=_enqueue_run)
+        except Exception as exc:
+            summary["probes"][key] = {"error": str(exc), "elapsed_seconds": round(time.monotonic() - start, 3)}
+            continue
+        result_payload = result["result"]
+        findings = result_payload.findings
+        summary["probes"][key] = {
+            "severity": result_payload.severity,
+            "finding_count": len(findings),
+            "categories": dict(Counter(
+                f.get("category", "general") if isinstance(f, dict) else "general" for f in findings
+            )),
+            "approvals": result["approvals"],
+            "approved": result["approved"],
+            "abstained": result["abstained"],
+            "skipped": result["skipped"],
+            "patch_count": len(result["patches"]),
+            "run_id": result["run_id"],
+            "elapsed_seconds": round(time.monotonic() - start, 3),
+        }
+    return summary
+
+
+def build_report(summaries, elapsed, writes=None):
+    """
+    Combine per-repo summaries into a cross-repo report; writes is the memory writer's status
+    """
+    by_severity = Counter()
+    by_category = Counter()
+    failures = 0
+    for summary in summaries:
+        for probe in summary["probes"].values():
+            if "error" in probe:
+                failures += 1
+                continue
+            by_severity[probe["severity"]] += 1
+            by_category.update(probe["categories"])
+    return {
+        "repos": sorted(summaries, key=lambda s: s["repo"]),
+        "totals": {
+            "repo_count": len(summaries),
+            "probe_failures": failures,
+            "by_severity": dict(by_severity),
+            "by_category": dict(by_category),
+            "write_failures": writes["failed_batches"] if writes else 0,
+            "dropped_records": writes["dropped_records"] if writes else 0,
+            "write_errors": writes["errors"] if writes else [],
+            "elapsed_seconds": round(elapsed, 3),
+        },
+    }
+
+
+def run_fleet(repos, probe_keys=DEFAULT_PROBES, workers=None):
+    """
+    Audit repos in parallel across a process pool and return the combined report.
+    Raises RuntimeError if the memory writer process dies, since its pending writes are lost.
+    """
+    start = time.monotonic()
+    queue = multiprocessing.Queue()
+    status = multiprocessing.Queue()
+    writer = multiprocessing.Process(target=memory_writer, args=(queue, status), name="hexprobe-memory-writer")
+    writer.start()
+    summaries = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(queue,)) as pool:
+            futures = {pool.submit(audit_repo, repo, tuple(probe_keys)): repo for repo in repos}
+            for future in as_completed(futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as exc:
+                    summaries.append({"repo": futures[future], "probes": {"*": {"error": str(exc)}}})
+    finally:
+        queue.put(None)
+        writer.join()
+    if writer.exitcode != 0:
+        raise RuntimeError(f"memory writer exited with code {writer.exitcode}; knowledge and memory writes were lost")
+    return build_report(summaries, time.monotonic() - start, writes=status.get(timeout=WRITER_FLUSH_SECONDS * 5))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.fleet", description="Audit many repositories in parallel")
+    parser.add_argument("targets", nargs="+", help="repository paths or manifest files (one repo per line)")
+    parser.add_argument("--probe", action="append", dest="probes", help="probe key to run (repeatable)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write the combined JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    repos = []
+    for target in args.targets:
+        path = Path(target)
+        repos.extend(load_manifest(path) if path.is_file() else [str(path.resolve())])
+
+    report = run_fleet(repos, probe_keys=args.probes or DEFAULT_PROBES, workers=args.workers)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, default=str)
+    else:
+        json.dump(report, sys.stdout, indent=2, default=str)
+        print()
+    totals = report["totals"]
+    return 1 if totals["probe_failures"] or totals["write_failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Import-time budget check.
+
+Imports each library entry point in a fresh interpreter with
+``python -X importtime`` and fails when its cumulative import time exceeds
+the budget, or when importing it touches the HexProbe data directory.
+
+    python -m core.importtime
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Cumulative import time budget per module, in microseconds.
+IMPORT_BUDGETS_US = {
+    "core.synthesis": 150_000,
+    "probes.registry": 60_000,
+    "probes.scoring": 5_000,
+    "probes.severity": 5_000,
+}
+
+
+def measure_import(module, data_dir):
+    """
+    Return the cumulative import time of module in microseconds, measured in a fresh interpreter.
+    """
+    env = dict(os.environ, HEXPROBE_DATA_DIR=str(data_dir))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise RuntimeError(f"{module} did not appear in -X importtime output")
+
+
+def check_budgets(budgets=None):
+    """
+    Return a list of budget violations; empty when every module is within budget.
+    """
+    violations = []
+    for module, budget in (budgets or IMPORT_BUDGETS_US).items():
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "hexprobe"
+            elapsed = measure_import(module, data_dir)
+            if elapsed > budget:
+                violations.append(f"{module}: {elapsed}us exceeds budget of {budget}us")
+            if data_dir.exists():
+                violations.append(f"{module}: importing created the data directory")
+    return violations
+
+
+def main() -> int:
+    violations = check_budgets()
+    for violation in violations:
+        print(violation, file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
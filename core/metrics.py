@@ -0,0 +1,292 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms.
+
+Metrics are created (or looked up) by name with counter(), gauge() and
+histogram(), so modules declare what they record next to the code that
+records it. Updating a metric is a dict lookup and an add under a lock, so
+instrumentation stays on all the time.
+
+The registry is exposed in Prometheus text format:
+
+- HEXPROBE_METRICS_PORT=9464 serves http://127.0.0.1:9464/metrics
+- HEXPROBE_METRICS_FILE=/path/hexprobe.prom rewrites the file every
+  HEXPROBE_METRICS_INTERVAL seconds (default 15) and at exit, e.g. for the
+  node_exporter textfile collector
+
+Long-running entry points (daemon, watch, scheduler) call start_exporter().
+"""
+import atexit
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Latency buckets in seconds, from fast SQLite writes to long probe runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+DEFAULT_EXPORT_INTERVAL = 15.0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _samples(self):
+        with self._lock:
+            return [(key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._samples()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts, with a final +Inf bucket, then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels):
+        """
+        Context manager observing the duration of its block
+        """
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def _samples(self):
+        with self._lock:
+            return [(key, (list(state[0]), state[1])) for key, state in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, (counts, total) in sorted(self._samples()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, cls, name, help_text, labels=(), **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **options)
+            elif type(metric) is not cls or metric.label_names != tuple(labels):
+                raise ValueError(f"metric {name} is already registered with a different type or labels")
+            return metric
+
+    def render(self):
+        """
+        All metrics in Prometheus text exposition format
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, help_text, labels=()):
+    return REGISTRY.get_or_create(Counter, name, help_text, labels)
+
+
+def gauge(name, help_text, labels=()):
+    return REGISTRY.get_or_create(Gauge, name, help_text, labels)
+
+
+def histogram(name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+
+def timed(metric, **labels):
+    """
+    Decorator observing a function's duration in a histogram
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
+
+
+# Shared by every module that writes to SQLite
+STORAGE_WRITE_SECONDS = histogram("hexprobe_storage_write_seconds",
+                                  "Latency of knowledge and global memory writes", ("operation",))
+
+
+# -- exposition ----------------------------------------------------------------
+
+def write_textfile(path, registry=REGISTRY):
+    """
+    Atomically write the registry to path in Prometheus text format
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def serve(port, host="127.0.0.1", registry=REGISTRY):
+    """
+    Serve /metrics over HTTP from a background thread; returns the server
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="hexprobe-metrics", daemon=True).start()
+    return server
+
+
+_exporter = {"started": False}
+
+
+def start_exporter():
+    """
+    Start the exporters configured through HEXPROBE_METRICS_PORT / HEXPROBE_METRICS_FILE (once per process)
+    """
+    if _exporter["started"]:
+        return
+    _exporter["started"] = True
+    if os.getenv("HEXPROBE_METRICS_PORT"):
+        serve(int(os.environ["HEXPROBE_METRICS_PORT"]))
+    path = os.getenv("HEXPROBE_METRICS_FILE")
+    if path:
+        interval = float(os.getenv("HEXPROBE_METRICS_INTERVAL", DEFAULT_EXPORT_INTERVAL))
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                write_textfile(path)
+
+        threading.Thread(target=loop, name="hexprobe-metrics-file", daemon=True).start()
+        atexit.register(write_textfile, path)
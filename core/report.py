@@ -0,0 +1,229 @@
+"""
+Streaming report export.
+
+Reports are newline-delimited JSON, optionally gzip (``.gz``) or lzma
+(``.xz``) compressed. The first line is a compact index header; the
+remaining lines are grouped into sections (findings per severity and
+category, approvals, patches, summary). Each section in the index records
+its byte offset and length in the uncompressed body, so a reader can seek
+straight to e.g. the critical findings without parsing the rest.
+
+Records are spooled per section to temporary files while the cycle runs
+and assembled into the final file on close, so memory use stays flat.
+"""
+import gzip
+import json
+import lzma
+import shutil
+import tempfile
+from pathlib import Path
+
+REPORT_FORMAT = "hexprobe-report"
+REPORT_VERSION = 1
+SEVERITY_ORDER = ["critical", "high", "medium", "low", "info"]
+
+
+def _open_compressed(path, mode):
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, mode)
+    if suffix == ".xz":
+        return lzma.open(path, mode)
+    return open(path, mode)
+
+
+def serialize_patch(patch):
+    if isinstance(patch, dict):
+        return patch
+    return {
+        "id": getattr(patch, "id", None),
+        "description": getattr(patch, "description", None),
+        "rationale": getattr(patch, "rationale", None),
+        "code_snippet": getattr(patch, "code_snippet", None),
+        "finding_count": len(getattr(patch, "findings", [])),
+        "created_at": str(getattr(patch, "created_at", "")),
+    }
+
+
+def _finding_section(finding):
+    if isinstance(finding, dict):
+        severity = finding.get("severity") or "info"
+        category = finding.get("category") or "general"
+    else:
+        severity, category = "info", "general"
+    return f"findings/{severity}/{category}"
+
+
+def _section_rank(name):
+    parts = name.split("/")
+    if parts[0] == "findings":
+        severity = parts[1]
+        rank = SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else len(SEVERITY_ORDER)
+        return (0, rank, parts[2])
+    return (1, 0, name)
+
+
+class ReportWriter:
+    """
+    Incrementally writes a report; use as a context manager or call close().
+    """
+    def __init__(self, path, meta=None):
+        self.path = Path(path)
+        self.meta = dict(meta or {})
+        self._spools = {}
+        self._counts = {}
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write(self, section, record):
+        spool = self._spools.get(section)
+        if spool is None:
+            spool = self._spools[section] = tempfile.TemporaryFile()
+            self._counts[section] = 0
+        spool.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+        self._counts[section] += 1
+
+    def write_finding(self, finding):
+        self._write(_finding_section(finding), {"type": "finding", "finding": finding})
+
+    def write_approvals(self, approvals, abstained=(), skipped=()):
+        """
+        Agent verdicts, plus the agents that abstained (no finding in their domain)
+        and those skipped once the quorum was decided
+        """
+        self._write("approvals", {"type": "approvals", "approvals": approvals,
+                                  "abstained": list(abstained), "skipped": list(skipped)})
+
+    def write_patch(self, patch):
+        self._write("patches", {"type": "patch", "patch": serialize_patch(patch)})
+
+    def write_summary(self, **summary):
+        self._write("summary", {"type": "summary", **summary})
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        sections = []
+        offset = 0
+        for name in sorted(self._spools, key=_section_rank):
+            spool = self._spools[name]
+            length = spool.tell()
+            section = {"name": name, "offset": offset, "length": length, "count": self._counts[name]}
+            if name.startswith("findings/"):
+                _, section["severity"], section["category"] = name.split("/", 2)
+            sections.append(section)
+            offset += length
+
+        header = {"type": "header", "format": REPORT_FORMAT, "version": REPORT_VERSION,
+                  "meta": self.meta, "sections": sections}
+        try:
+            with _open_compressed(self.path, "wb") as out:
+                out.write(json.dumps(header, default=str, separators=(",", ":")).encode("utf-8") + b"\n")
+                for section in sections:
+                    spool = self._spools[section["name"]]
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, out)
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+
+
+class ReportReader:
+    """
+    Reads reports written by ReportWriter, seeking directly to requested sections.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self._handle = _open_compressed(self.path, "rb")
+        header_line = self._handle.readline()
+        self.header = json.loads(header_line)
+        if self.header.get("format") != REPORT_FORMAT:
+            self._handle.close()
+            raise ValueError(f"{path} is not a HexProbe report")
+        self._body_start = len(header_line)
+        self.meta = self.header.get("meta", {})
+        self.sections = self.header["sections"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._handle.close()
+
+    def _iter_section(self, section):
+        self._handle.seek(self._body_start + section["offset"])
+        remaining = section["length"]
+        while remaining > 0:
+            line = self._handle.readline()
+            if not line:
+                break
+            remaining -= len(line)
+            yield json.loads(line)
+
+    def iter_records(self, name):
+        for section in self.sections:
+            if section["name"] == name:
+                yield from self._iter_section(section)
+
+    def iter_findings(self, severity=None, category=None):
+        """
+        Yield findings, optionally restricted to a severity and/or category
+        """
+        for section in self.sections:
+            if "severity" not in section:
+                continue
+            if severity is not None and section["severity"] != severity:
+                continue
+            if category is not None and section["category"] != category:
+                continue
+            for record in self._iter_section(section):
+                yield record["finding"]
+
+    def approvals(self):
+        for record in self.iter_records("approvals"):
+            return record["approvals"]
+        return {}
+
+    def abstained(self):
+        for record in self.iter_records("approvals"):
+            return record.get("abstained", [])
+        return []
+
+    def skipped(self):
+        for record in self.iter_records("approvals"):
+            return record.get("skipped", [])
+        return []
+
+    def iter_patches(self):
+        for record in self.iter_records("patches"):
+            yield record["patch"]
+
+    def summary(self):
+        for record in self.iter_records("summary"):
+            return {k: v for k, v in record.items() if k != "type"}
+        return {}
+
+
+def write_result(path, result, meta=None):
+    """
+    Write a run_full_cycle result dict as a streaming report
+    """
+    result_payload = result["result"]
+    with ReportWriter(path, meta=meta) as writer:
+        for finding in result_payload.findings:
+            writer.write_finding(finding)
+        writer.write_approvals(result["approvals"], abstained=result.get("abstained", ()),
+                               skipped=result.get("skipped", ()))
+        for patch in result["patches"]:
+            writer.write_patch(patch)
+        writer.write_summary(severity=result_payload.severity, repro=result_payload.repro,
+                             rationale=result_payload.rationale)
@@ -0,0 +1,216 @@
+"""
+Time-budgeted probe scheduling.
+
+Given a time budget, the scheduler picks and orders the pipeline stages of
+hexprobe.yaml using each probe's recorded runtime and outcome history for the
+repo (knowledge.history.probe_stats):
+
+- a stage's value is the chance it trips its fail_on gate, weighted by its
+  typical finding count; stages run in order of value per expected second,
+  so cheap, likely-failing probes report first
+- stages that do not fit the remaining budget are skipped
+- stages with a min_timeout (fuzzing) are cut to whatever time is left,
+  after everything that fits at full length has been scheduled
+- while running, each stage is re-checked against the time actually left,
+  so time saved by fast stages is not wasted
+
+    python -m core.scheduler . --budget 15m
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+from core.config import StageConfig, find_config, load_pipeline
+from core.metrics import start_exporter
+from probes.severity import SEVERITY_ORDER
+
+# Expected runtime of a stage that has never run against the repo
+DEFAULT_STAGE_SECONDS = 60.0
+# Share of the budget held back for agents, patches and memory writes around the probes
+BUDGET_MARGIN = 0.05
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value):
+    """
+    Parse a duration such as "90", "90s", "15m" or "1h" into seconds
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid duration: {value!r}")
+    return float(match[1]) * _DURATION_UNITS[match[2].lower()]
+
+
+def at_least(severity, threshold):
+    if severity not in SEVERITY_ORDER or threshold not in SEVERITY_ORDER:
+        return False
+    return SEVERITY_ORDER.index(severity) >= SEVERITY_ORDER.index(threshold)
+
+
+@dataclass
+class PlannedStage:
+    config: StageConfig
+    expected_seconds: float
+    fail_probability: float
+    expected_findings: float
+    # ctx["timeout"] handed to the probe; set for stages with a configured timeout
+    timeout: float | None = None
+
+    @property
+    def cuttable(self):
+        return self.config.min_timeout is not None
+
+    @property
+    def value(self):
+        return self.fail_probability * max(self.expected_findings, 1.0)
+
+    @property
+    def density(self):
+        return self.value / max(self.expected_seconds, 1.0)
+
+
+@dataclass
+class Schedule:
+    budget_seconds: float
+    planned: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+
+
+def estimate(stage, stats):
+    """
+    Expected cost and value of one stage from its history (stats as returned by probe_stats)
+    """
+    history = stats.get(stage.stage)
+    full_seconds = stage.timeout if stage.min_timeout is not None and stage.timeout else None
+    if not history or not history["runs"]:
+        return PlannedStage(stage, full_seconds or stage.timeout or DEFAULT_STAGE_SECONDS, 0.5, 1.0,
+                            timeout=stage.timeout)
+    failing = sum(runs for severity, runs in history["severities"].items() if at_least(severity, stage.fail_on))
+    return PlannedStage(
+        stage,
+        # Cuttable stages run for as long as they are given, so their history says little about full length
+        full_seconds or history["ewma_seconds"],
+        # Laplace-smoothed so a few clean runs do not rule a stage out forever
+        (failing + 1) / (history["runs"] + 2),
+        history["ewma_findings"] or 0.0,
+        timeout=stage.timeout,
+    )
+
+
+def plan(stages, budget_seconds, stats):
+    """
+    Choose and order stages to fit budget_seconds
+    """
+    schedule = Schedule(budget_seconds)
+    remaining = budget_seconds * (1 - BUDGET_MARGIN)
+    deferred = []
+    for item in sorted((estimate(stage, stats) for stage in stages), key=lambda p: p.density, reverse=True):
+        if item.expected_seconds <= remaining:
+            schedule.planned.append(item)
+            remaining -= item.expected_seconds
+        elif item.cuttable:
+            deferred.append(item)
+        else:
+            schedule.skipped.append(item)
+    for item in deferred:
+        if remaining >= item.config.min_timeout:
+            item.timeout = item.expected_seconds = remaining
+            schedule.planned.append(item)
+            remaining = 0
+        else:
+            schedule.skipped.append(item)
+    schedule.planned.sort(key=lambda p: p.density, reverse=True)
+    return schedule
+
+
+def run_schedule(orchestrator, repo, schedule, deadline=None):
+    """
+    Run a schedule through the orchestrator, yielding one outcome dict per stage
+    as it completes. Each stage is checked against the time actually left: time
+    saved by fast stages goes to cuttable stages and to stages skipped while
+    planning, and stages that no longer fit are skipped.
+    """
+    from probes.registry import load_probe
+
+    if deadline is None:
+        deadline = time.monotonic() + schedule.budget_seconds
+    end = deadline - schedule.budget_seconds * BUDGET_MARGIN
+    queue = schedule.planned + schedule.skipped
+    for index, item in enumerate(queue):
+        stage = item.config
+        outcome = {"stage": stage.name, "probe": stage.stage}
+        # Time still promised to the planned fixed-length stages after this one
+        reserved = sum(later.expected_seconds for later in schedule.planned[index + 1:] if not later.cuttable)
+        available = end - time.monotonic() - reserved
+        ctx = {}
+        if item.cuttable:
+            ctx["timeout"] = min(stage.timeout or available, available)
+            if ctx["timeout"] < stage.min_timeout:
+                yield {**outcome, "skipped": "budget"}
+                continue
+        elif item.expected_seconds > available:
+            yield {**outcome, "skipped": "budget"}
+            continue
+        elif item.timeout is not None:
+            ctx["timeout"] = item.timeout
+
+        start = time.monotonic()
+        try:
+            cycle = orchestrator.run_full_cycle(load_probe(stage.stage), repo, ctx=ctx)
+        except Exception as exc:
+            yield {**outcome, "error": str(exc), "seconds": round(time.monotonic() - start, 3)}
+            continue
+        severity = cycle["result"].severity
+        yield {
+            **outcome,
+            "severity": severity,
+            "failed": at_least(severity, stage.fail_on),
+            "findings": len(cycle["result"].findings),
+            "approved": cycle["approved"],
+            "abstained": cycle["abstained"],
+            "skipped": cycle["skipped"],
+            "run_id": cycle["run_id"],
+            "seconds": round(time.monotonic() - start, 3),
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.scheduler",
+                                     description="Run the pipeline within a time budget")
+    parser.add_argument("repo")
+    parser.add_argument("--budget", required=True, help="time budget, e.g. 900, 15m or 1h")
+    parser.add_argument("--config", help="pipeline config (default: <repo>/hexprobe.yaml or the bundled one)")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without running it")
+    args = parser.parse_args(argv)
+
+    from core.synthesis import HexProbeOrchestrator
+    from knowledge.history import probe_stats
+    from pathlib import Path
+
+    budget = parse_duration(args.budget)
+    deadline = time.monotonic() + budget
+    repo = str(Path(args.repo).resolve())
+    schedule = plan(load_pipeline(args.config or find_config(repo)), budget, probe_stats(repo))
+    if args.dry_run:
+        for item in schedule.planned:
+            print(json.dumps({"stage": item.config.name, "expected_seconds": round(item.expected_seconds, 1),
+                              "fail_probability": round(item.fail_probability, 3), "timeout": item.timeout}))
+        for item in schedule.skipped:
+            print(json.dumps({"stage": item.config.name, "skipped": "budget"}))
+        return 0
+
+    start_exporter()
+    failed = False
+    for outcome in run_schedule(HexProbeOrchestrator(), repo, schedule, deadline=deadline):
+        failed = failed or outcome.get("failed", False)
+        print(json.dumps(outcome), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Memory-bounded sequences for large cycles.
+
+A SpillStore owns a memory budget shared by the SpillLists it creates.
+Lists keep their items in memory until the budget is exceeded; the list
+being appended to at that point moves its items into a temporary SQLite
+file and is iterated back lazily from there. Iteration order is always
+insertion order, so consumers see the same items as with a plain list.
+"""
+import os
+import pickle
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+from core.storage import get_data_dir
+
+_WRITE_BATCH = 256
+_READ_BATCH = 512
+# Spill files are removed when their cycle's data is released; prune_spill_dir catches leftovers
+SPILL_MAX_AGE_SECONDS = 86400
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+_stores = weakref.WeakValueDictionary()
+
+
+def parse_size(value):
+    """
+    Parse a byte size such as "512M", "2G" or "1048576". None and "" mean unlimited.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid size: {value!r}")
+    return int(match[1]) * _SIZE_UNITS[match[2].upper()]
+
+
+def default_memory_budget():
+    return parse_size(os.getenv("HEXPROBE_MEMORY_BUDGET"))
+
+
+def prune_spill_dir(max_age_seconds=SPILL_MAX_AGE_SECONDS, directory=None):
+    """
+    Delete spill files untouched for max_age_seconds (left behind by processes that
+    did not exit cleanly, or by older versions). Returns the number of files removed.
+    """
+    directory = directory or get_data_dir() / "spill"
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _close_spill_file(state):
+    if state["conn"] is not None:
+        state["conn"].close()
+    if state["path"] is not None:
+        try:
+            os.unlink(state["path"])
+        except FileNotFoundError:
+            pass
+
+
+def _restore_list(store_id, list_id):
+    return _stores[store_id].lists[list_id]
+
+
+class SpillStore:
+    def __init__(self, budget_bytes, directory=None):
+        self.budget_bytes = budget_bytes
+        self.directory = directory
+        self.id = uuid.uuid4().hex
+        self.lists = []
+        self.memory_bytes = 0
+        self.lock = threading.RLock()
+        self._state = {"conn": None, "path": None}
+        _stores[self.id] = self
+        self._finalizer = weakref.finalize(self, _close_spill_file, self._state)
+
+    def new_list(self, items=()):
+        spill_list = SpillList(self, len(self.lists))
+        self.lists.append(spill_list)
+        spill_list.extend(items)
+        return spill_list
+
+    @property
+    def conn(self):
+        if self._state["conn"] is None:
+            directory = self.directory or get_data_dir() / "spill"
+            os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(dir=directory, prefix="cycle-", suffix=".db")
+            os.close(fd)
+            self._state["path"] = path
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE items (list_id INTEGER, seq INTEGER, data BLOB, PRIMARY KEY (list_id, seq))")
+            self._state["conn"] = conn
+        return self._state["conn"]
+
+    def close(self):
+        self._finalizer()
+
+
+class SpillList:
+    """
+    Append-only, re-iterable sequence backed by a SpillStore
+    """
+    def __init__(self, store, list_id):
+        self._store = store
+        self._id = list_id
+        self._items = []
+        self._bytes = 0
+        self._pending = []
+        self._length = 0
+        self.spilled = False
+
+    def __reduce__(self):
+        # Nested lists (e.g. the findings a spilled patch covers) are pickled by reference
+        return _restore_list, (self._store.id, self._id)
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def append(self, item):
+        store = self._store
+        with store.lock:
+            if self.spilled:
+                self._pending.append((self._id, self._length, pickle.dumps(item)))
+                if len(self._pending) >= _WRITE_BATCH:
+                    self._flush()
+            else:
+                size = len(pickle.dumps(item))
+                self._items.append(item)
+                self._bytes += size
+                store.memory_bytes += size
+                if store.memory_bytes > store.budget_bytes:
+                    self._spill()
+            self._length += 1
+
+    def _spill(self):
+        store = self._store
+        self._pending.extend((self._id, seq, pickle.dumps(item)) for seq, item in enumerate(self._items))
+        self._flush()
+        store.memory_bytes -= self._bytes
+        self._items = []
+        self._bytes = 0
+        self.spilled = True
+
+    def _flush(self):
+        if self._pending:
+            with self._store.conn:
+                self._store.conn.executemany("INSERT INTO items (list_id, seq, data) VALUES (?,?,?)", self._pending)
+            self._pending = []
+
+    def __iter__(self):
+        if not self.spilled:
+            yield from list(self._items)
+            return
+        last_seq = -1
+        while True:
+            with self._store.lock:
+                self._flush()
+                rows = self._store.conn.execute(
+                    "SELECT seq, data FROM items WHERE list_id=? AND seq>? ORDER BY seq LIMIT ?",
+                    (self._id, last_seq, _READ_BATCH),
+                ).fetchall()
+            if not rows:
+                return
+            for seq, data in rows:
+                last_seq = seq
+                yield pickle.loads(data)
@@ -1,9 +1,16 @@
 from pathlib import Path
 import os
+import sqlite3
+import threading
 
 
 DEFAULT_DATA_DIR = Path.home() / ".hexprobe"
 
+_persistent_connections = False
+_connection_cache = threading.local()
+_migrated = set()
+_migrate_lock = threading.Lock()
+
 
 def get_data_dir() -> Path:
     """
@@ -12,3 +19,95 @@ def get_data_dir() -> Path:
     data_dir = Path(os.getenv("HEXPROBE_DATA_DIR", DEFAULT_DATA_DIR))
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
+
+
+class _PersistentConnection(sqlite3.Connection):
+    """
+    Connection that stays open across callers. close() keeps it open and, like
+    closing a real connection, discards any uncommitted transaction; writes are
+    kept only by an explicit commit() or a `with conn:` block.
+    """
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+
+def enable_persistent_connections():
+    """
+    Reuse one SQLite connection per database and thread instead of
+    reconnecting on every call. Used by long-running processes such as the daemon.
+    """
+    global _persistent_connections
+    _persistent_connections = True
+
+
+def close_persistent_connections():
+    """
+    Close the cached connections of the calling thread.
+    """
+    cache = getattr(_connection_cache, "conns", {})
+    for conn in cache.values():
+        conn.really_close()
+    cache.clear()
+
+
+def apply_migrations(conn, migrations):
+    """
+    Bring a database up to date with an ordered list of migrations.
+
+    Each migration is a list of SQL statements; its 1-based position is the
+    schema version it produces. Applied versions are tracked in schema_version.
+    Pending migrations run under the database write lock (BEGIN IMMEDIATE) and
+    the version is re-read inside it, so concurrent processes opening a fresh
+    database apply each migration exactly once.
+    """
+    version_query = "SELECT COALESCE(MAX(version), 0) FROM schema_version"
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TEXT)")
+    if conn.execute(version_query).fetchone()[0] >= len(migrations):
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = conn.execute(version_query).fetchone()[0]
+        for version, statements in enumerate(migrations[current:], start=current + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, datetime('now'))",
+                (version,),
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def connect(db_path, migrations=()):
+    """
+    Open a connection to db_path, reusing a cached one when persistent mode is on.
+
+    The schema is migrated lazily on the first connection made by this process.
+    """
+    key = str(db_path)
+    if _persistent_connections:
+        cache = getattr(_connection_cache, "conns", None)
+        if cache is None:
+            cache = _connection_cache.conns = {}
+        conn = cache.get(key)
+        if conn is None:
+            conn = sqlite3.connect(db_path, factory=_PersistentConnection)
+            cache[key] = conn
+    else:
+        conn = sqlite3.connect(db_path)
+
+    if migrations and key not in _migrated:
+        with _migrate_lock:
+            if key not in _migrated:
+                apply_migrations(conn, migrations)
+                _migrated.add(key)
+    return conn
@@ -1,13 +1,60 @@
 from agents import ALL_AGENTS
-from probes.meta import ProbeResult
-from ai.propose_patch import synthesize_patch
-from knowledge.learn import record_pattern
+from agents.dispatch import DEFAULT_AGENT_TIMEOUT, AgentDispatcher
+from core.artifacts import ArtifactStore
+from core.metrics import counter, gauge, histogram
+from core.spill import SpillList, SpillStore, default_memory_budget
+from ai.propose_patch import synthesize_patches
+from knowledge.history import current_commit, make_run, store_run
+from knowledge.learn import derive_signature, record_pattern
 from memory.promote import promote_pattern, promote_probe_lineage
 from dataclasses import dataclass
-from datetime import datetime
+from pathlib import Path
+import functools
+import inspect
+import itertools
+import time
 import uuid
 
 
+CYCLES = counter("hexprobe_cycles_total", "Completed probe cycles by result severity", ("probe", "severity"))
+CYCLE_SECONDS = histogram("hexprobe_cycle_seconds", "Duration of full probe cycles", ("probe",))
+CYCLES_IN_PROGRESS = gauge("hexprobe_cycles_in_progress", "Probe cycles currently running")
+FINDINGS = counter("hexprobe_findings_total", "Findings reported by probes", ("probe",))
+PATCHES = counter("hexprobe_patches_total", "Patch proposals synthesized", ("probe",))
+PROBE_RUNS = counter("hexprobe_probe_runs_total", "Probe runs by outcome (ok or error)", ("probe", "outcome"))
+PROBE_SECONDS = histogram("hexprobe_probe_seconds", "Probe run time", ("probe",))
+# Findings of a patch tried when deriving the signature of the pattern learned from it
+SIGNATURE_CANDIDATES = 5
+_PATTERN_NAMESPACE = uuid.UUID("9d3c8f0a-2b71-4e55-8c1e-6f4a7b2d9e30")
+
+
+def probe_label(probe_func):
+    return getattr(probe_func, "__module__", None) or "unknown"
+
+
+@functools.lru_cache(maxsize=256)
+def probe_keywords(probe_func):
+    """
+    The optional keywords (ctx, artifacts) probe_func accepts; older and external
+    probes may take only the repo
+    """
+    try:
+        parameters = inspect.signature(probe_func).parameters
+    except (TypeError, ValueError):
+        return frozenset()
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        return frozenset(("ctx", "artifacts"))
+    return frozenset(name for name in ("ctx", "artifacts") if name in parameters
+                     and parameters[name].kind is not inspect.Parameter.POSITIONAL_ONLY)
+
+
+def discard(_records):
+    """
+    memory_sink / history_sink for cycles that must not be stored (e.g. watch mode);
+    the orchestrator skips the work of building what it would drop
+    """
+
+
 @dataclass
 class ResultPayload:
     findings: list
@@ -26,14 +73,38 @@ class HexProbeOrchestrator:
     - AI-assisted patch synthesis
     - Memory and knowledge promotion
     """
-    def __init__(self):
+    def __init__(self, quorum="all", agent_timeout=DEFAULT_AGENT_TIMEOUT, memory_budget=None):
         self.agents = ALL_AGENTS
+        self.dispatcher = AgentDispatcher(self.agents, quorum=quorum, timeout=agent_timeout)
+        # Bytes of findings/patches kept in RAM per cycle before spilling to disk (None = unbounded)
+        self.memory_budget = memory_budget if memory_budget is not None else default_memory_budget()
 
-    def run_probe(self, probe_func, repo, artifacts=None):
+    def artifacts_for(self, repo):
         """
-        Executes a probe and collects results
+        Default artifact store for a repo: one persistent namespace per repository path
+        """
+        return ArtifactStore(namespace=str(Path(repo).resolve()))
+
+    def run_probe(self, probe_func, repo, artifacts=None, ctx=None):
         """
-        result = probe_func(repo, artifacts=artifacts)
+        Executes a probe and collects results.
+        ctx carries per-run options for the probe, e.g. {"timeout": seconds} from the scheduler.
+        ctx and artifacts are only passed to probes whose signature accepts them.
+        """
+        accepted = probe_keywords(probe_func)
+        kwargs = {}
+        if "ctx" in accepted:
+            kwargs["ctx"] = ctx
+        if "artifacts" in accepted:
+            kwargs["artifacts"] = artifacts if artifacts is not None else self.artifacts_for(repo)
+        probe = probe_label(probe_func)
+        outcome = "error"
+        try:
+            with PROBE_SECONDS.time(probe=probe):
+                result = probe_func(repo, **kwargs)
+            outcome = "ok"
+        finally:
+            PROBE_RUNS.inc(probe=probe, outcome=outcome)
         return result
 
     def normalize_result_payload(self, result):
@@ -43,7 +114,7 @@ class HexProbeOrchestrator:
         def normalize_findings(findings):
             if findings is None:
                 return []
-            if isinstance(findings, list):
+            if isinstance(findings, (list, SpillList)):
                 return findings
             return [findings]
 
@@ -60,10 +131,7 @@ class HexProbeOrchestrator:
                 repro=result.get("repro"),
                 rationale=rationale,
             )
-        if hasattr(result, "rationale"):
-            rationale = getattr(result, "rationale")
-        else:
-            rationale = None
+        rationale = result.rationale if hasattr(result, "rationale") else None
         if rationale is None:
             rationale = ""
         return ResultPayload(
@@ -73,67 +141,162 @@ class HexProbeOrchestrator:
             rationale=rationale,
         )
 
+    def dispatch_agents(self, result):
+        """
+        Route findings to agents by domain and collect their votes under the quorum policy
+        """
+        return self.dispatcher.dispatch(self.normalize_result_payload(result))
+
     def evaluate_with_agents(self, result):
         """
-        Ask all agents to approve or flag a finding
+        Ask agents to approve or flag a finding. Only agents that voted appear;
+        see dispatch_agents for the abstained and skipped ones.
         """
-        result_payload = self.normalize_result_payload(result)
-        approvals = {}
-        for agent in self.agents:
-            try:
-                approvals[agent.name] = agent.approve(result_payload)
-            except Exception:
-                approvals[agent.name] = False
-        return approvals
+        return self.dispatch_agents(result).approvals
 
-    def propose_fixes(self, result, context=None):
+    def propose_fixes(self, result, context=None, spill=None):
         """
-        Generate AI-assisted patch proposals for each finding
+        Generate AI-assisted patch proposals, one per group of equivalent findings
         """
         result_payload = self.normalize_result_payload(result)
-        patches = []
-        for finding in result_payload.findings:
-            if isinstance(finding, dict):
-                patch_input = finding
-            else:
-                patch_input = {"category": "general", "message": str(finding)}
-            patch = synthesize_patch(patch_input, context=context)
-            patches.append(patch)
-        return patches
+        patch_inputs = (
+            finding if isinstance(finding, dict) else {"category": "general", "message": str(finding)}
+            for finding in result_payload.findings
+        )
+        new_list = spill.new_list if spill is not None else list
+        return synthesize_patches(patch_inputs, context=context, new_list=new_list)
 
     def integrate_memory(self, pattern, probe_info):
         """
         Record patterns in local knowledge and promote to global memory
         """
-        record_pattern(pattern["id"], pattern["category"], pattern["description"], pattern["severity"])
+        record_pattern(pattern["id"], pattern["category"], pattern["description"], pattern["severity"],
+                       signature=pattern.get("signature"))
         promote_pattern(pattern)
         promote_probe_lineage(probe_info)
 
-    def run_full_cycle(self, probe_func, repo, artifacts=None):
+    def build_memory_records(self, result_payload, patches, repo):
         """
-        Run probe → evaluate → synthesize patches → integrate memory
+        Build the (pattern, probe_info) pairs a cycle contributes to memory.
+        A pattern learned from a patch gets the source line of one of its findings as
+        signature, so its generated probe can look for it; the pattern id is derived
+        from that signature, so learning the same line again bumps the same pattern.
+        Findings of generated probes already belong to a learned pattern: each such
+        pattern gets one record under its own id, which bumps its trigger counts.
         """
-        result = self.run_probe(probe_func, repo, artifacts=artifacts)
-        result_payload = self.normalize_result_payload(result)
-        approvals = self.evaluate_with_agents(result_payload)
-        patches = self.propose_fixes(result_payload)
+        from probes.generated.batch import probe_id
+
+        records = []
+        matched = {}
         for patch in patches:
+            linked = [f for f in patch.findings if isinstance(f, dict) and f.get("pattern_id")]
+            for finding in linked:
+                matched.setdefault(finding["pattern_id"], finding)
+            if patch.findings and len(linked) == len(patch.findings):
+                continue
+            candidates = (f for f in patch.findings if not (isinstance(f, dict) and f.get("pattern_id")))
+            signature = next(filter(None, (derive_signature(f, repo)
+                                           for f in itertools.islice(candidates, SIGNATURE_CANDIDATES))), None)
             # link patch to a dummy pattern for memory integration example
             pattern = {
-                "id": str(uuid.uuid4()),
+                "id": str(uuid.uuid5(_PATTERN_NAMESPACE, signature) if signature else uuid.uuid4()),
                 "category": "auto_generated",
                 "description": patch.description,
                 "severity": result_payload.severity,
+                "signature": signature,
                 "trigger_count": 1,
                 "false_positive_count": 0
             }
             probe_info = {
-                "probe_id": str(uuid.uuid4()),
+                "probe_id": probe_id(pattern["id"], str(repo)) if signature else str(uuid.uuid4()),
                 "pattern_id": pattern["id"],
-                "bug_id": str(uuid.uuid4()),
+                "bug_id": None if signature else str(uuid.uuid4()),
                 "fix_commit": None,
                 "originating_repo": repo
             }
-            self.integrate_memory(pattern, probe_info)
+            records.append((pattern, probe_info))
+        for pattern_id, finding in matched.items():
+            pattern = {"id": pattern_id, "category": finding["category"], "description": finding["message"],
+                       "severity": finding["severity"], "trigger_count": 1, "false_positive_count": 0}
+            probe_info = {"probe_id": probe_id(pattern_id, str(repo)), "pattern_id": pattern_id,
+                          "bug_id": None, "fix_commit": None, "originating_repo": repo}
+            records.append((pattern, probe_info))
+        return records
+
+    def record_history(self, probe_func, repo, result_payload, commit=None, history_sink=None, duration=None):
+        """
+        Store the cycle's findings (and the probe's runtime) in run history and return the run id.
+        With the discard sink nothing is recorded (not even the commit looked up) and None is returned.
+        """
+        if history_sink is discard:
+            return None
+        run = make_run(repo, result_payload.findings,
+                       commit=commit if commit is not None else current_commit(repo),
+                       probe=getattr(probe_func, "__module__", None),
+                       severity=result_payload.severity, duration=duration)
+        if history_sink is not None:
+            history_sink(run)
+        else:
+            store_run(run)
+        return run["run_id"]
+
+    def run_full_cycle(self, probe_func, repo, artifacts=None, memory_sink=None, report=None,
+                       commit=None, history_sink=None, ctx=None):
+        """
+        Run probe → evaluate → synthesize patches → integrate memory
+
+        memory_sink, when given, receives the cycle's (pattern, probe_info)
+        records instead of writing them to memory directly; history_sink
+        likewise receives the run history record.
+        report, when given, is a core.report.ReportWriter that each stage
+        streams its output to as it completes.
+        With a memory budget, findings and patches beyond it are spilled to disk.
+        ctx is passed through to the probe.
+        """
+        CYCLES_IN_PROGRESS.inc()
+        try:
+            return self._run_full_cycle(probe_func, repo, artifacts, memory_sink, report, commit, history_sink, ctx)
+        finally:
+            CYCLES_IN_PROGRESS.dec()
+
+    def _run_full_cycle(self, probe_func, repo, artifacts, memory_sink, report, commit, history_sink, ctx):
+        start = time.monotonic()
+        result = self.run_probe(probe_func, repo, artifacts=artifacts, ctx=ctx)
+        duration = time.monotonic() - start
+        result_payload = self.normalize_result_payload(result)
+        spill = None
+        if self.memory_budget is not None:
+            spill = SpillStore(self.memory_budget)
+            result_payload.findings = spill.new_list(result_payload.findings)
+            # Drop the probe's own copy so only the bounded one stays alive
+            result = None
+        run_id = self.record_history(probe_func, repo, result_payload, commit=commit, history_sink=history_sink,
+                                     duration=duration)
+        if report is not None:
+            for finding in result_payload.findings:
+                report.write_finding(finding)
+        dispatch = self.dispatch_agents(result_payload)
+        approvals = dispatch.approvals
+        if report is not None:
+            report.write_approvals(approvals, abstained=dispatch.abstained, skipped=dispatch.skipped)
+        patches = self.propose_fixes(result_payload, spill=spill)
+        if report is not None:
+            for patch in patches:
+                report.write_patch(patch)
+            report.write_summary(severity=result_payload.severity, repro=result_payload.repro,
+                                 rationale=result_payload.rationale)
+        records = [] if memory_sink is discard else self.build_memory_records(result_payload, patches, repo)
+        if memory_sink is not None:
+            memory_sink(records)
+        else:
+            for pattern, probe_info in records:
+                self.integrate_memory(pattern, probe_info)
 
-        return {"result": result_payload, "approvals": approvals, "patches": patches}
+        probe = probe_label(probe_func)
+        CYCLES.inc(probe=probe, severity=result_payload.severity)
+        CYCLE_SECONDS.observe(time.monotonic() - start, probe=probe)
+        FINDINGS.inc(len(result_payload.findings), probe=probe)
+        PATCHES.inc(len(patches), probe=probe)
+        return {"result": result_payload, "approvals": approvals, "approved": dispatch.approved,
+                "abstained": dispatch.abstained, "skipped": dispatch.skipped, "patches": patches, "run_id": run_id,
+                "pattern_ids": [pattern["id"] for pattern, _ in records]}
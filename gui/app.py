@@ -1,54 +1,22 @@
+import itertools
 import json
 import threading
 import time
 import traceback
-from dataclasses import dataclass
 from pathlib import Path
 from queue import Queue, Empty
 from tkinter import Tk, StringVar, Text, filedialog, messagebox
 from tkinter import ttk
 
+from core.report import serialize_patch, write_result
 from core.synthesis import HexProbeOrchestrator
-from probes.fuzz.fuzz_probe import run as fuzz_probe
-from probes.perf.chaos import run as chaos_probe
-from probes.perf.perf_probe import run as perf_probe
-from probes.static.surface_sweep import run as surface_sweep
-
-
-@dataclass(frozen=True)
-class ProbeDefinition:
-    key: str
-    name: str
-    description: str
-    func: callable
-
-
-PROBES = [
-    ProbeDefinition(
-        key="static.surface_sweep",
-        name="Static Surface Sweep",
-        description="Scan for lint, type, and boundary input risks.",
-        func=surface_sweep,
-    ),
-    ProbeDefinition(
-        key="fuzz.fuzz_probe",
-        name="Fuzz Probe",
-        description="Run fuzzing scripts to detect crashes and memory safety issues.",
-        func=fuzz_probe,
-    ),
-    ProbeDefinition(
-        key="perf.perf_probe",
-        name="Performance Probe",
-        description="Compare load test metrics against a baseline.",
-        func=perf_probe,
-    ),
-    ProbeDefinition(
-        key="perf.chaos",
-        name="Chaos Probe",
-        description="Simulate service disruptions and report failures.",
-        func=chaos_probe,
-    ),
-]
+from core.watch import Watcher
+from knowledge.feedback import record_false_positives
+from probes.registry import PROBES, ProbeDefinition, get_probe
+
+
+# Findings/patches rendered in the result tabs; exports always contain everything
+DISPLAY_LIMIT = 1000
 
 
 class HexProbeGUI:
@@ -64,6 +32,7 @@ class HexProbeGUI:
         self.last_result = None
         self.task_queue: Queue = Queue()
         self.worker: threading.Thread | None = None
+        self.watcher: Watcher | None = None
 
         self._build_layout()
         self._bind_events()
@@ -106,8 +75,17 @@ class HexProbeGUI:
         self.export_button.grid(row=0, column=1, sticky="w", padx=(8, 0))
         self.export_button.state(["disabled"])
 
+        self.false_positive_button = ttk.Button(
+            action_bar, text="Mark False Positive", command=self._mark_false_positive
+        )
+        self.false_positive_button.grid(row=0, column=2, sticky="w", padx=(8, 0))
+        self.false_positive_button.state(["disabled"])
+
+        self.watch_button = ttk.Button(action_bar, text="Start Watch", command=self._toggle_watch)
+        self.watch_button.grid(row=0, column=3, sticky="w", padx=(8, 0))
+
         self.status_label = ttk.Label(action_bar, textvariable=self.status_text)
-        self.status_label.grid(row=0, column=2, sticky="e")
+        self.status_label.grid(row=0, column=4, sticky="e")
 
         body = ttk.Frame(root, padding=(12, 0, 12, 12))
         body.grid(row=2, column=0, sticky="nsew")
@@ -117,7 +95,8 @@ class HexProbeGUI:
         self.notebook = ttk.Notebook(body)
         self.notebook.grid(row=0, column=0, sticky="nsew")
 
-        self.findings_text = self._make_tab("Findings")
+        self.findings_tree = self._make_findings_tab()
+        self.displayed_findings = {}
         self.approvals_text = self._make_tab("Approvals")
         self.patches_text = self._make_tab("Patch Proposals")
         self.summary_text = self._make_tab("Summary")
@@ -137,8 +116,27 @@ class HexProbeGUI:
         self.notebook.add(frame, text=label)
         return text
 
+    def _make_findings_tab(self) -> ttk.Treeview:
+        frame = ttk.Frame(self.notebook)
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
+        columns = ("severity", "category", "location", "message")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="extended")
+        for column, width in zip(columns, (80, 110, 260, 480)):
+            tree.heading(column, text=column.capitalize())
+            tree.column(column, width=width, stretch=column == "message")
+        tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(frame, command=tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        tree.configure(yscrollcommand=scrollbar.set)
+        self.findings_note = ttk.Label(frame, text="", foreground="#4a4a4a")
+        self.findings_note.grid(row=1, column=0, columnspan=2, sticky="w")
+        self.notebook.add(frame, text="Findings")
+        return tree
+
     def _bind_events(self) -> None:
         self.probe_combo.bind("<<ComboboxSelected>>", lambda _event: self._update_probe_description())
+        self.findings_tree.bind("<<TreeviewSelect>>", lambda _event: self._update_false_positive_button())
 
     def _update_probe_description(self) -> None:
         probe = self._get_selected_probe()
@@ -157,11 +155,7 @@ class HexProbeGUI:
         widget.configure(state="disabled")
 
     def _get_selected_probe(self) -> ProbeDefinition | None:
-        key = self.selected_probe.get()
-        for probe in PROBES:
-            if probe.key == key:
-                return probe
-        return None
+        return get_probe(self.selected_probe.get())
 
     def _run_probe(self) -> None:
         repo = self.repo_path.get().strip()
@@ -185,6 +179,7 @@ class HexProbeGUI:
         self.status_text.set("Running probe...")
         self.run_button.state(["disabled"])
         self.export_button.state(["disabled"])
+        self.false_positive_button.state(["disabled"])
         self._set_text(self.logs_text, f"Running {probe.name} against {repo_path}...\n")
 
         self.worker = threading.Thread(
@@ -228,13 +223,15 @@ class HexProbeGUI:
                     self._handle_result(message)
                 elif message["type"] == "error":
                     self._handle_error(message)
+                elif message["type"] == "watch":
+                    self._handle_watch(message)
         except Empty:
             pass
         self.root.after(200, self._poll_queue)
 
     def _handle_result(self, message: dict) -> None:
         result = message["payload"]
-        self.last_result = self._serialize_result(message)
+        self.last_result = message
         self.export_button.state(["!disabled"])
         elapsed = message["elapsed"]
         probe = message["probe"]
@@ -244,12 +241,15 @@ class HexProbeGUI:
         approvals = result["approvals"]
         patches = result["patches"]
 
-        self._set_text(self.findings_text, self._format_json(findings))
+        self._show_findings(findings)
         self._set_text(self.approvals_text, self._format_json(approvals))
-        self._set_text(self.patches_text, self._format_json(self._serialize_patches(patches)))
+        self._set_text(self.patches_text, self._format_limited(patches, serialize_patch))
 
         summary = {
             "severity": result_payload.severity,
+            "approved": result["approved"],
+            "abstained": result["abstained"],
+            "skipped": result["skipped"],
             "rationale": result_payload.rationale,
             "repro": result_payload.repro,
             "elapsed_seconds": round(elapsed, 2),
@@ -270,6 +270,95 @@ class HexProbeGUI:
         self.run_button.state(["!disabled"])
         messagebox.showerror("Probe failed", message["error"])
 
+    def _toggle_watch(self) -> None:
+        if self.watcher is not None:
+            # Joining waits for any in-flight refresh (minutes on a cold mypy run), so not on the Tk thread
+            watcher, self.watcher = self.watcher, None
+            threading.Thread(target=watcher.stop, name="hexprobe-watch-stop", daemon=True).start()
+            self.watch_button.config(text="Start Watch")
+            self.run_button.state(["!disabled"])
+            self.status_text.set("Watch stopped.")
+            self._append_log("Watch stopped.")
+            return
+
+        repo_path = Path(self.repo_path.get().strip())
+        if not repo_path.is_dir():
+            messagebox.showerror("Repository not found", f"{repo_path} does not exist.")
+            return
+        if self.worker and self.worker.is_alive():
+            messagebox.showinfo("Probe running", "A probe is already running. Please wait.")
+            return
+
+        self.watcher = Watcher(repo_path, on_update=self._queue_watch_update).start()
+        self.watch_button.config(text="Stop Watch")
+        self.run_button.state(["disabled"])
+        self.status_text.set("Watching for changes...")
+        self._append_log(f"Watching {repo_path}; changed files are re-audited on save.")
+
+    def _queue_watch_update(self, update: dict) -> None:
+        # Runs on the watch thread; the findings snapshot is taken here and rendered by _poll_queue
+        watcher = self.watcher
+        findings = watcher.findings() if watcher is not None else []
+        self.task_queue.put({"type": "watch", "update": update, "findings": findings})
+
+    def _handle_watch(self, message: dict) -> None:
+        if self.watcher is None:
+            return
+        update = message["update"]
+        self._show_findings(message["findings"])
+        self._set_text(self.summary_text, self._format_json(update))
+        changed = update["changed"]
+        scope = "full audit" if changed is None else f"{len(changed)} changed file(s)"
+        self._append_log(
+            f"Watch: re-audited {scope} in {update['seconds']:.2f}s; {update['findings']} finding(s)."
+        )
+        self.status_text.set(f"Watching: {update['findings']} finding(s).")
+
+    def _show_findings(self, findings) -> None:
+        tree = self.findings_tree
+        tree.delete(*tree.get_children())
+        self.displayed_findings = {}
+        for finding in itertools.islice(findings, DISPLAY_LIMIT):
+            if not isinstance(finding, dict):
+                finding = {"message": str(finding)}
+            lines = str(finding.get("message") or "").splitlines()
+            iid = tree.insert("", "end", values=(
+                finding.get("severity", ""), finding.get("category", ""),
+                finding.get("location") or "", lines[0][:300] if lines else "",
+            ))
+            self.displayed_findings[iid] = finding
+        hidden = len(findings) - len(self.displayed_findings)
+        note = "Select findings of generated probes to mark their pattern as a false positive."
+        if hidden > 0:
+            note = f"{hidden} more not shown; export the report to see all of them. " + note
+        self.findings_note.config(text=note)
+        self._update_false_positive_button()
+
+    def _selected_pattern_ids(self) -> list[str]:
+        """
+        Distinct learned-pattern ids of the selected findings (only generated probes' findings carry one)
+        """
+        pattern_ids = (self.displayed_findings.get(iid, {}).get("pattern_id")
+                       for iid in self.findings_tree.selection())
+        return list(dict.fromkeys(pattern_id for pattern_id in pattern_ids if pattern_id))
+
+    def _update_false_positive_button(self) -> None:
+        self.false_positive_button.state(["!disabled" if self._selected_pattern_ids() else "disabled"])
+
+    def _mark_false_positive(self) -> None:
+        pattern_ids = self._selected_pattern_ids()
+        if not pattern_ids:
+            return
+        confirmed = messagebox.askyesno(
+            "Mark false positive",
+            f"Record the {len(pattern_ids)} pattern(s) behind the selected finding(s) as false positives?",
+        )
+        if not confirmed:
+            return
+        updated = record_false_positives(pattern_ids)
+        self.findings_tree.selection_set(())
+        self._append_log(f"Recorded false-positive feedback for {updated} pattern(s).")
+
     def _append_log(self, entry: str) -> None:
         self.logs_text.configure(state="normal")
         self.logs_text.insert("end", f"{entry}\n")
@@ -279,19 +368,18 @@ class HexProbeGUI:
     def _format_json(self, payload: object) -> str:
         return json.dumps(payload, indent=2, default=str)
 
-    def _serialize_patches(self, patches: list) -> list[dict]:
-        serialized = []
-        for patch in patches:
-            serialized.append(
-                {
-                    "id": getattr(patch, "id", None),
-                    "description": getattr(patch, "description", None),
-                    "rationale": getattr(patch, "rationale", None),
-                    "code_snippet": getattr(patch, "code_snippet", None),
-                    "created_at": str(getattr(patch, "created_at", "")),
-                }
-            )
-        return serialized
+    def _format_limited(self, items, serialize=None) -> str:
+        shown = list(itertools.islice(items, DISPLAY_LIMIT))
+        if serialize is not None:
+            shown = [serialize(item) for item in shown]
+        text = self._format_json(shown)
+        hidden = len(items) - len(shown)
+        if hidden > 0:
+            text += f"\n... {hidden} more not shown; export the report to see all of them."
+        return text
+
+    def _serialize_patches(self, patches) -> list[dict]:
+        return [serialize_patch(patch) for patch in patches]
 
     def _serialize_result(self, message: dict) -> dict:
         result = message["payload"]
@@ -301,12 +389,14 @@ class HexProbeGUI:
             "probe": message["probe"].key,
             "elapsed_seconds": round(message["elapsed"], 2),
             "result": {
-                "findings": result_payload.findings,
+                "findings": list(result_payload.findings),
                 "severity": result_payload.severity,
                 "repro": result_payload.repro,
                 "rationale": result_payload.rationale,
             },
             "approvals": result["approvals"],
+            "abstained": result["abstained"],
+            "skipped": result["skipped"],
             "patches": self._serialize_patches(result["patches"]),
         }
 
@@ -318,14 +408,28 @@ class HexProbeGUI:
         file_path = filedialog.asksaveasfilename(
             title="Save report",
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
+            filetypes=[
+                ("JSON files", "*.json"),
+                ("NDJSON report", "*.ndjson"),
+                ("Gzip NDJSON report", "*.ndjson.gz"),
+                ("LZMA NDJSON report", "*.ndjson.xz"),
+            ],
         )
         if not file_path:
             return
 
+        message = self.last_result
         try:
-            with open(file_path, "w", encoding="utf-8") as handle:
-                json.dump(self.last_result, handle, indent=2)
+            if file_path.endswith(".json"):
+                with open(file_path, "w", encoding="utf-8") as handle:
+                    json.dump(self._serialize_result(message), handle, indent=2, default=str)
+            else:
+                meta = {
+                    "repo": message["repo"],
+                    "probe": message["probe"].key,
+                    "elapsed_seconds": round(message["elapsed"], 2),
+                }
+                write_result(file_path, message["payload"], meta=meta)
         except OSError as exc:
             messagebox.showerror("Save failed", str(exc))
             return
@@ -0,0 +1,37 @@
+from collections import Counter
+
+from knowledge.store import get_conn
+from memory.central import get_conn as get_global_conn
+
+
+def _apply_false_positives(conn, table, id_column, counts):
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS fp_votes (pattern_id TEXT PRIMARY KEY, votes INTEGER)")
+    conn.execute("DELETE FROM fp_votes")
+    conn.executemany("INSERT INTO fp_votes (pattern_id, votes) VALUES (?,?)", counts.items())
+    updated = conn.execute(
+        f"UPDATE {table} SET false_positive_count = false_positive_count + "
+        f"(SELECT votes FROM fp_votes WHERE fp_votes.pattern_id = {table}.{id_column}) "
+        f"WHERE {id_column} IN (SELECT pattern_id FROM fp_votes)"
+    ).rowcount
+    conn.execute("DELETE FROM fp_votes")
+    return updated
+
+
+def record_false_positives(pattern_ids):
+    """
+    Records false-positive verdicts for many patterns at once, in local and global memory.
+    A pattern id given several times counts once per occurrence.
+    Returns the number of local patterns updated.
+    """
+    counts = Counter(pattern_ids)
+    if not counts:
+        return 0
+    with get_conn() as conn:
+        updated = _apply_false_positives(conn, "patterns", "id", counts)
+    conn = get_global_conn()
+    try:
+        _apply_false_positives(conn, "global_patterns", "pattern_id", counts)
+        conn.commit()
+    finally:
+        conn.close()
+    return updated
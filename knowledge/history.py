@@ -0,0 +1,223 @@
+import hashlib
+import subprocess
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from ai.propose_patch import finding_key
+from core.metrics import STORAGE_WRITE_SECONDS, timed
+from knowledge.store import get_conn
+
+_FINDING_COLUMNS = "fingerprint, category, severity, message, location, rule, occurrences"
+# Weight of the newest run in the moving averages of probe runtime and finding count
+STATS_SMOOTHING = 0.3
+
+
+def current_commit(repo):
+    """
+    Returns the HEAD commit of repo, or None when it is not a git checkout
+    """
+    try:
+        proc = subprocess.run(["git", "-C", str(repo), "rev-parse", "HEAD"],
+                              capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip() or None
+
+
+def repo_key(repo):
+    """
+    The key runs and probe statistics of repo are stored under: its resolved path,
+    so ".", relative and absolute spellings of one repository share a history
+    """
+    return str(Path(repo).resolve())
+
+
+def _as_dict(finding):
+    if isinstance(finding, dict):
+        return finding
+    return {"category": "general", "severity": "info", "message": str(finding)}
+
+
+def fingerprint(finding):
+    """
+    Stable identity of a finding across runs: its grouping key plus the file it is in.
+    Line numbers are left out so unrelated edits do not make findings look new.
+    """
+    finding = _as_dict(finding)
+    category, template, rule = finding_key(finding)
+    path = str(finding.get("location") or "").split(":", 1)[0]
+    raw = "\x1f".join(str(part) for part in (category, template, rule, path))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def make_run(repo, findings, commit=None, probe=None, severity=None, duration=None):
+    """
+    Builds a run record (run metadata plus fingerprinted findings) ready for store_run.
+    duration is the probe's runtime in seconds, used for scheduling statistics.
+    """
+    rows = {}
+    for finding in findings:
+        finding = _as_dict(finding)
+        fp = fingerprint(finding)
+        if fp in rows:
+            rows[fp]["occurrences"] += 1
+            continue
+        rows[fp] = {
+            "fingerprint": fp,
+            "category": finding.get("category"),
+            "severity": finding.get("severity"),
+            "message": str(finding.get("message")),
+            "location": finding.get("location"),
+            "rule": finding.get("rule"),
+            "occurrences": 1,
+        }
+    return {
+        "run_id": str(uuid.uuid4()),
+        "repo": repo_key(repo),
+        "commit": commit,
+        "probe": probe,
+        "severity": severity,
+        "duration": duration,
+        "created_at": datetime.utcnow().isoformat(),
+        "findings": list(rows.values()),
+    }
+
+
+@timed(STORAGE_WRITE_SECONDS, operation="store_run")
+def store_run(run):
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO runs (run_id, repo, commit_sha, probe, severity, created_at) VALUES (?,?,?,?,?,?)",
+            (run["run_id"], run["repo"], run["commit"], run["probe"], run["severity"], run["created_at"]),
+        )
+        conn.executemany(
+            f"INSERT INTO run_findings (run_id, {_FINDING_COLUMNS}) VALUES (?,?,?,?,?,?,?,?)",
+            [(run["run_id"], f["fingerprint"], f["category"], f["severity"], f["message"],
+              f["location"], f["rule"], f["occurrences"]) for f in run["findings"]],
+        )
+        if run.get("duration") is not None and run["probe"]:
+            _update_probe_stats(conn, run)
+    return run["run_id"]
+
+
+def _update_probe_stats(conn, run):
+    # A run at "info" severity found nothing (clean probes report a status message as their finding)
+    found = 0 if run["severity"] in (None, "info") else sum(f["occurrences"] for f in run["findings"])
+    conn.execute(
+        "INSERT INTO probe_stats (repo, probe, runs, total_seconds, ewma_seconds, ewma_findings, updated_at) "
+        "VALUES (?,?,1,?,?,?,?) ON CONFLICT(repo, probe) DO UPDATE SET "
+        "runs = runs + 1, total_seconds = total_seconds + excluded.total_seconds, "
+        f"ewma_seconds = ewma_seconds + {STATS_SMOOTHING} * (excluded.ewma_seconds - ewma_seconds), "
+        f"ewma_findings = ewma_findings + {STATS_SMOOTHING} * (excluded.ewma_findings - ewma_findings), "
+        "updated_at = excluded.updated_at",
+        (run["repo"], run["probe"], run["duration"], run["duration"], found, run["created_at"]),
+    )
+    conn.execute(
+        "INSERT INTO probe_outcomes (repo, probe, severity, runs) VALUES (?,?,?,1) "
+        "ON CONFLICT(repo, probe, severity) DO UPDATE SET runs = runs + 1",
+        (run["repo"], run["probe"], run["severity"] or "info"),
+    )
+
+
+def record_run(repo, findings, commit=None, probe=None, severity=None, duration=None):
+    """
+    Records one cycle's findings and returns the new run id
+    """
+    return store_run(make_run(repo, findings, commit=commit, probe=probe, severity=severity, duration=duration))
+
+
+def probe_stats(repo):
+    """
+    Runtime and outcome history of every probe run against repo:
+    {probe: {"runs", "mean_seconds", "ewma_seconds", "ewma_findings", "severities": {severity: runs}}}
+    """
+    stats = {}
+    with get_conn() as conn:
+        for probe, runs, total, ewma_seconds, ewma_findings in conn.execute(
+            "SELECT probe, runs, total_seconds, ewma_seconds, ewma_findings FROM probe_stats WHERE repo=?",
+            (repo_key(repo),),
+        ):
+            stats[probe] = {"runs": runs, "mean_seconds": total / runs if runs else None,
+                            "ewma_seconds": ewma_seconds, "ewma_findings": ewma_findings, "severities": {}}
+        for probe, severity, runs in conn.execute(
+            "SELECT probe, severity, runs FROM probe_outcomes WHERE repo=?", (repo_key(repo),)
+        ):
+            if probe in stats:
+                stats[probe]["severities"][severity] = runs
+    return stats
+
+
+def latest_run(repo, commit=None, probe=None):
+    """
+    Returns the id of the most recent run for repo, optionally at a given commit and probe
+    """
+    query = "SELECT run_id FROM runs WHERE repo=?"
+    params = [repo_key(repo)]
+    if commit is not None:
+        query += " AND commit_sha=?"
+        params.append(commit)
+    if probe is not None:
+        query += " AND probe=?"
+        params.append(probe)
+    query += " ORDER BY created_at DESC LIMIT 1"
+    with get_conn() as conn:
+        row = conn.execute(query, params).fetchone()
+    return row[0] if row else None
+
+
+def _rows_to_findings(rows):
+    return [dict(fingerprint=r[0], category=r[1], severity=r[2], message=r[3], location=r[4],
+                 rule=r[5], occurrences=r[6]) for r in rows]
+
+
+def diff_runs(base_run_id, head_run_id):
+    """
+    Compares two runs by fingerprint.
+    Returns new (only in head), fixed (only in base) and persisting (in both, as seen in head) findings.
+    """
+    side_query = (
+        f"SELECT {_FINDING_COLUMNS} FROM run_findings WHERE run_id=:side AND fingerprint IN ("
+        "SELECT fingerprint FROM run_findings WHERE run_id=:left "
+        "{op} SELECT fingerprint FROM run_findings WHERE run_id=:right)"
+    )
+    with get_conn() as conn:
+        new = conn.execute(side_query.format(op="EXCEPT"),
+                           {"side": head_run_id, "left": head_run_id, "right": base_run_id}).fetchall()
+        fixed = conn.execute(side_query.format(op="EXCEPT"),
+                             {"side": base_run_id, "left": base_run_id, "right": head_run_id}).fetchall()
+        persisting = conn.execute(side_query.format(op="INTERSECT"),
+                                  {"side": head_run_id, "left": head_run_id, "right": base_run_id}).fetchall()
+    return {
+        "base": base_run_id,
+        "head": head_run_id,
+        "new": _rows_to_findings(new),
+        "fixed": _rows_to_findings(fixed),
+        "persisting": _rows_to_findings(persisting),
+    }
+
+
+def compact_runs(keep_per_repo=50, max_age_days=None):
+    """
+    Applies the retention policy: keep the newest keep_per_repo runs of each repo
+    and, if max_age_days is set, drop runs older than that. Returns the number of runs removed.
+    """
+    with get_conn() as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS expired_runs (run_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM expired_runs")
+        conn.execute(
+            "INSERT OR IGNORE INTO expired_runs SELECT run_id FROM ("
+            "SELECT run_id, ROW_NUMBER() OVER (PARTITION BY repo ORDER BY created_at DESC) AS rank FROM runs"
+            ") WHERE rank > ?",
+            (keep_per_repo,),
+        )
+        if max_age_days is not None:
+            cutoff_date = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
+            conn.execute("INSERT OR IGNORE INTO expired_runs SELECT run_id FROM runs WHERE created_at < ?",
+                         (cutoff_date,))
+        conn.execute("DELETE FROM run_findings WHERE run_id IN (SELECT run_id FROM expired_runs)")
+        removed = conn.execute("DELETE FROM runs WHERE run_id IN (SELECT run_id FROM expired_runs)").rowcount
+        conn.execute("DELETE FROM expired_runs")
+    return removed
@@ -1,9 +1,41 @@
 from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from core.metrics import STORAGE_WRITE_SECONDS, timed
 from knowledge.store import get_conn
 
-def record_pattern(pattern_id, category, description, severity):
+# Derived signatures shorter than this match too much to be useful; longer ones are cut
+MIN_SIGNATURE_LENGTH = 12
+MAX_SIGNATURE_LENGTH = 200
+
+
+def derive_signature(finding, repo=None):
     """
-    Records a new pattern or increments trigger count
+    Signature for a pattern learned from finding: the stripped source line at its
+    location ("path:line[:column]", relative paths resolved against repo), or None
+    when the line cannot be read or is too short to be distinctive
+    """
+    location = finding.get("location") if isinstance(finding, dict) else None
+    parts = str(location or "").split(":")
+    if len(parts) < 2 or not parts[1].isdigit() or int(parts[1]) < 1:
+        return None
+    path = Path(parts[0])
+    if not path.is_absolute() and repo is not None:
+        path = Path(repo) / path
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            line = next(islice(handle, int(parts[1]) - 1, None), "")
+    except OSError:
+        return None
+    signature = line.strip()[:MAX_SIGNATURE_LENGTH]
+    return signature if len(signature) >= MIN_SIGNATURE_LENGTH else None
+
+
+@timed(STORAGE_WRITE_SECONDS, operation="record_pattern")
+def record_pattern(pattern_id, category, description, severity, signature=None):
+    """
+    Records a new pattern or increments trigger count.
+    signature is the source text the pattern's generated probe looks for.
     """
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -13,10 +45,40 @@ def record_pattern(pattern_id, category, description, severity):
 
         if existing:
             cursor.execute(
-                "UPDATE patterns SET trigger_count=trigger_count+1 WHERE id=?", (pattern_id,)
+                "UPDATE patterns SET trigger_count=trigger_count+1, signature=COALESCE(?, signature) WHERE id=?",
+                (signature, pattern_id),
             )
         else:
             cursor.execute(
-                "INSERT INTO patterns (id, category, description, severity, created_at) VALUES (?,?,?,?,?)",
-                (pattern_id, category, description, severity, datetime.utcnow().isoformat())
+                "INSERT INTO patterns (id, category, description, severity, created_at, signature) VALUES (?,?,?,?,?,?)",
+                (pattern_id, category, description, severity, datetime.utcnow().isoformat(), signature)
             )
+
+@timed(STORAGE_WRITE_SECONDS, operation="record_patterns")
+def record_patterns(patterns):
+    """
+    Batch version of record_pattern for a list of pattern dicts, in one transaction
+    """
+    now = datetime.utcnow().isoformat()
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO patterns (id, category, description, severity, created_at, signature) VALUES (?,?,?,?,?,?) "
+            "ON CONFLICT(id) DO UPDATE SET trigger_count=trigger_count+1, "
+            "signature=COALESCE(excluded.signature, signature)",
+            [(p["id"], p["category"], p["description"], p["severity"], now, p.get("signature")) for p in patterns],
+        )
+
+def active_patterns(limit=None):
+    """
+    Active (not retired) patterns as dicts, highest score first
+    """
+    query = ("SELECT id, category, description, severity, signature FROM patterns "
+             "WHERE COALESCE(status, 'active') = 'active' ORDER BY score DESC, created_at")
+    params = ()
+    if limit is not None:
+        query += " LIMIT ?"
+        params = (limit,)
+    with get_conn() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [{"id": r[0], "category": r[1], "description": r[2], "severity": r[3], "signature": r[4]}
+            for r in rows]
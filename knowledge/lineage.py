@@ -1,6 +1,8 @@
+from core.metrics import STORAGE_WRITE_SECONDS, timed
 from knowledge.store import get_conn
 from datetime import datetime
 
+@timed(STORAGE_WRITE_SECONDS, operation="record_lineage")
 def record_lineage(probe_id, pattern_id, bug_id, fix_commit, repo):
     """
     Records the origin of each auto-generated probe
@@ -12,6 +14,24 @@ def record_lineage(probe_id, pattern_id, bug_id, fix_commit, repo):
             (probe_id, pattern_id, bug_id, fix_commit, repo, datetime.utcnow().isoformat()),
         )
 
+@timed(STORAGE_WRITE_SECONDS, operation="record_lineages")
+def record_lineages(lineages):
+    """
+    Batch version of record_lineage for a list of lineage dicts, in one transaction.
+    Rows already stored with the same content are left untouched (created_at included).
+    """
+    now = datetime.utcnow().isoformat()
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO probe_lineage (probe_id, pattern_id, bug_id, fix_commit, originating_repo, created_at) VALUES (?,?,?,?,?,?) "
+            "ON CONFLICT(probe_id) DO UPDATE SET pattern_id=excluded.pattern_id, bug_id=excluded.bug_id, "
+            "fix_commit=excluded.fix_commit, originating_repo=excluded.originating_repo, created_at=excluded.created_at "
+            "WHERE pattern_id IS NOT excluded.pattern_id OR bug_id IS NOT excluded.bug_id "
+            "OR fix_commit IS NOT excluded.fix_commit OR originating_repo IS NOT excluded.originating_repo",
+            [(row["probe_id"], row["pattern_id"], row.get("bug_id"), row.get("fix_commit"), row["originating_repo"], now)
+             for row in lineages],
+        )
+
 def get_probe_lineage(probe_id):
     with get_conn() as conn:
         cursor = conn.cursor()
@@ -1,43 +1,109 @@
-import sqlite3
+from core.storage import connect, get_data_dir
 
-from core.storage import get_data_dir
 
+DB_FILENAME = "hexprobe_knowledge.db"
 
-DB_PATH = get_data_dir() / "hexprobe_knowledge.db"
+# Ordered schema migrations; index + 1 is the schema version.
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS patterns (
+            id TEXT PRIMARY KEY,
+            category TEXT,
+            description TEXT,
+            severity TEXT,
+            trigger_count INTEGER DEFAULT 0,
+            false_positive_count INTEGER DEFAULT 0,
+            created_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS probe_lineage (
+            probe_id TEXT PRIMARY KEY,
+            pattern_id TEXT,
+            bug_id TEXT,
+            fix_commit TEXT,
+            originating_repo TEXT,
+            created_at TEXT
+        )
+        """,
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            repo TEXT,
+            commit_sha TEXT,
+            probe TEXT,
+            severity TEXT,
+            created_at TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_runs_repo_created ON runs (repo, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_runs_repo_commit ON runs (repo, commit_sha)",
+        """
+        CREATE TABLE IF NOT EXISTS run_findings (
+            run_id TEXT,
+            fingerprint TEXT,
+            category TEXT,
+            severity TEXT,
+            message TEXT,
+            location TEXT,
+            rule TEXT,
+            occurrences INTEGER DEFAULT 1,
+            PRIMARY KEY (run_id, fingerprint)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_run_findings_fingerprint ON run_findings (fingerprint)",
+    ],
+    [
+        "ALTER TABLE patterns ADD COLUMN status TEXT DEFAULT 'active'",
+        "ALTER TABLE patterns ADD COLUMN base_severity TEXT",
+        "ALTER TABLE patterns ADD COLUMN score INTEGER DEFAULT 0",
+        "UPDATE patterns SET base_severity = severity",
+        "CREATE INDEX IF NOT EXISTS idx_patterns_score ON patterns (score)",
+    ],
+    [
+        """
+        CREATE TABLE IF NOT EXISTS probe_stats (
+            repo TEXT,
+            probe TEXT,
+            runs INTEGER DEFAULT 0,
+            total_seconds REAL DEFAULT 0,
+            ewma_seconds REAL,
+            ewma_findings REAL,
+            updated_at TEXT,
+            PRIMARY KEY (repo, probe)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS probe_outcomes (
+            repo TEXT,
+            probe TEXT,
+            severity TEXT,
+            runs INTEGER DEFAULT 0,
+            PRIMARY KEY (repo, probe, severity)
+        ) WITHOUT ROWID
+        """,
+    ],
+    [
+        # Literal text whose presence in a file triggers the pattern's generated probe
+        "ALTER TABLE patterns ADD COLUMN signature TEXT",
+    ],
+]
 
 
-def get_conn():
-    return sqlite3.connect(DB_PATH)
+def get_db_path():
+    return get_data_dir() / DB_FILENAME
 
 
-def init_db():
-    with get_conn() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS patterns (
-                id TEXT PRIMARY KEY,
-                category TEXT,
-                description TEXT,
-                severity TEXT,
-                trigger_count INTEGER DEFAULT 0,
-                false_positive_count INTEGER DEFAULT 0,
-                created_at TEXT
-            )
-            """
-        )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS probe_lineage (
-                probe_id TEXT PRIMARY KEY,
-                pattern_id TEXT,
-                bug_id TEXT,
-                fix_commit TEXT,
-                originating_repo TEXT,
-                created_at TEXT
-            )
-            """
-        )
+def get_conn():
+    return connect(get_db_path(), MIGRATIONS)
 
 
-init_db()
+def init_db():
+    """
+    Eagerly create or migrate the knowledge schema. Normally this happens on first use.
+    """
+    conn = get_conn()
+    conn.close()
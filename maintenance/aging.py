@@ -1,6 +1,17 @@
+import time
+
+from core.metrics import counter, gauge, histogram
+from core.spill import prune_spill_dir
+from knowledge.history import compact_runs
 from knowledge.store import get_conn
+from probes.static.toolstate import evict_idle_tools
 from datetime import datetime, timedelta
 
+AGING_CYCLES = counter("hexprobe_aging_cycles_total", "Completed aging cycles")
+AGING_SECONDS = histogram("hexprobe_aging_seconds", "Duration of aging cycles")
+AGING_LAST_RUN = gauge("hexprobe_aging_last_run_timestamp_seconds", "Unix time the last aging cycle finished")
+AGING_REMOVED = counter("hexprobe_aging_removed_total", "Items removed by aging", ("kind",))
+
 def prune_old_patterns(max_age_days=180):
     """
     Remove patterns that have not triggered within max_age_days
@@ -8,9 +19,9 @@ def prune_old_patterns(max_age_days=180):
     with get_conn() as conn:
         cursor = conn.cursor()
         cutoff_date = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
-        cursor.execute(
+        return cursor.execute(
             "DELETE FROM patterns WHERE created_at < ?", (cutoff_date,)
-        )
+        ).rowcount
 
 def prune_old_probes(max_age_days=180):
     """
@@ -19,13 +30,20 @@ def prune_old_probes(max_age_days=180):
     with get_conn() as conn:
         cursor = conn.cursor()
         cutoff_date = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat()
-        cursor.execute(
+        return cursor.execute(
             "DELETE FROM probe_lineage WHERE created_at < ?", (cutoff_date,)
-        )
+        ).rowcount
 
-def aging_cycle(max_age_days=180):
+def aging_cycle(max_age_days=180, keep_runs_per_repo=50):
     """
     Run full aging and pruning cycle
     """
-    prune_old_patterns(max_age_days)
-    prune_old_probes(max_age_days)
+    start = time.perf_counter()
+    AGING_REMOVED.inc(prune_old_patterns(max_age_days), kind="patterns")
+    AGING_REMOVED.inc(prune_old_probes(max_age_days), kind="probe_lineage")
+    AGING_REMOVED.inc(compact_runs(keep_per_repo=keep_runs_per_repo, max_age_days=max_age_days), kind="runs")
+    AGING_REMOVED.inc(evict_idle_tools(), kind="tool_caches")
+    AGING_REMOVED.inc(prune_spill_dir(), kind="spill_files")
+    AGING_SECONDS.observe(time.perf_counter() - start)
+    AGING_CYCLES.inc()
+    AGING_LAST_RUN.set(time.time())
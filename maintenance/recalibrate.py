@@ -0,0 +1,48 @@
+from knowledge.store import get_conn
+from memory.central import get_conn as get_global_conn
+from probes.scoring import probe_score_sql
+from probes.severity import adjust_severity_sql
+
+
+def _recalibrate_table(conn, table):
+    """
+    Re-derive severity (from the pattern's base severity) and score for every row in one statement
+    """
+    return conn.execute(
+        f"UPDATE {table} SET "
+        f"base_severity = COALESCE(base_severity, severity), "
+        f"severity = {adjust_severity_sql(severity='COALESCE(base_severity, severity)')}, "
+        f"score = {probe_score_sql()}"
+    ).rowcount
+
+
+def recalibrate_patterns():
+    """
+    Apply the severity and score rules to the whole local patterns table
+    """
+    with get_conn() as conn:
+        return _recalibrate_table(conn, "patterns")
+
+
+def recalibrate_global_patterns():
+    """
+    Apply the severity and score rules to the whole global_patterns table
+    """
+    conn = get_global_conn()
+    try:
+        updated = _recalibrate_table(conn, "global_patterns")
+        conn.commit()
+    finally:
+        conn.close()
+    return updated
+
+
+def recalibration_cycle():
+    """
+    Recalibrate local and global memory
+    """
+    return {"patterns": recalibrate_patterns(), "global_patterns": recalibrate_global_patterns()}
+
+
+if __name__ == "__main__":
+    print(recalibration_cycle())
@@ -1,45 +1,68 @@
-import sqlite3
+from core.storage import connect, get_data_dir
 
-from core.storage import get_data_dir
+GLOBAL_DB_FILENAME = "global.db"
+
+# Ordered schema migrations; index + 1 is the schema version.
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS global_patterns (
+            pattern_id TEXT PRIMARY KEY,
+            category TEXT,
+            description TEXT,
+            severity TEXT,
+            trigger_count INTEGER DEFAULT 0,
+            false_positive_count INTEGER DEFAULT 0,
+            created_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS probe_lineage_global (
+            probe_id TEXT PRIMARY KEY,
+            pattern_id TEXT,
+            bug_id TEXT,
+            fix_commit TEXT,
+            originating_repo TEXT,
+            created_at TEXT
+        )
+        """,
+    ],
+    [
+        "ALTER TABLE global_patterns ADD COLUMN status TEXT DEFAULT 'active'",
+        "ALTER TABLE global_patterns ADD COLUMN base_severity TEXT",
+        "ALTER TABLE global_patterns ADD COLUMN score INTEGER DEFAULT 0",
+        "UPDATE global_patterns SET base_severity = severity",
+        "CREATE INDEX IF NOT EXISTS idx_global_patterns_score ON global_patterns (score)",
+    ],
+    [
+        "CREATE TABLE IF NOT EXISTS memory_meta (key TEXT PRIMARY KEY, value TEXT)",
+        """
+        CREATE TABLE IF NOT EXISTS global_pattern_counters (
+            pattern_id TEXT,
+            node_id TEXT,
+            trigger_count INTEGER DEFAULT 0,
+            false_positive_count INTEGER DEFAULT 0,
+            PRIMARY KEY (pattern_id, node_id)
+        ) WITHOUT ROWID
+        """,
+    ],
+]
 
-GLOBAL_DB_PATH = get_data_dir() / "global.db"
+
+def get_global_db_path():
+    return get_data_dir() / GLOBAL_DB_FILENAME
 
 
 def get_conn():
     """
     Returns connection to central memory database shared across repos.
     """
-    return sqlite3.connect(GLOBAL_DB_PATH)
+    return connect(get_global_db_path(), MIGRATIONS)
 
 
 def init_global_db():
-    with get_conn() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS global_patterns (
-                pattern_id TEXT PRIMARY KEY,
-                category TEXT,
-                description TEXT,
-                severity TEXT,
-                trigger_count INTEGER DEFAULT 0,
-                false_positive_count INTEGER DEFAULT 0,
-                created_at TEXT
-            )
-            """
-        )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS probe_lineage_global (
-                probe_id TEXT PRIMARY KEY,
-                pattern_id TEXT,
-                bug_id TEXT,
-                fix_commit TEXT,
-                originating_repo TEXT,
-                created_at TEXT
-            )
-            """
-        )
-
-
-init_global_db()
+    """
+    Eagerly create or migrate the global memory schema. Normally this happens on first use.
+    """
+    conn = get_conn()
+    conn.close()
@@ -1,6 +1,8 @@
+from core.metrics import STORAGE_WRITE_SECONDS, timed
 from memory.central import get_conn
 from datetime import datetime
 
+@timed(STORAGE_WRITE_SECONDS, operation="promote_pattern")
 def promote_pattern(local_pattern):
     """
     Promote a locally learned pattern to the global memory
@@ -27,6 +29,7 @@ def promote_pattern(local_pattern):
     finally:
         conn.close()
 
+@timed(STORAGE_WRITE_SECONDS, operation="promote_probe_lineage")
 def promote_probe_lineage(probe_info):
     """
     Promote a locally recorded probe lineage to global memory
@@ -42,3 +45,37 @@ def promote_probe_lineage(probe_info):
         conn.commit()
     finally:
         conn.close()
+
+@timed(STORAGE_WRITE_SECONDS, operation="promote_patterns")
+def promote_patterns(local_patterns):
+    """
+    Batch version of promote_pattern, written in one transaction
+    """
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    try:
+        conn.executemany(
+            "INSERT INTO global_patterns (pattern_id, category, description, severity, trigger_count, false_positive_count, created_at) VALUES (?,?,?,?,?,?,?) "
+            "ON CONFLICT(pattern_id) DO UPDATE SET trigger_count=trigger_count+1",
+            [(p["id"], p["category"], p["description"], p["severity"],
+              p.get("trigger_count", 0), p.get("false_positive_count", 0), now) for p in local_patterns]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+@timed(STORAGE_WRITE_SECONDS, operation="promote_probe_lineages")
+def promote_probe_lineages(probe_infos):
+    """
+    Batch version of promote_probe_lineage, written in one transaction
+    """
+    now = datetime.utcnow().isoformat()
+    conn = get_conn()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO probe_lineage_global (probe_id, pattern_id, bug_id, fix_commit, originating_repo, created_at) VALUES (?,?,?,?,?,?)",
+            [(i["probe_id"], i["pattern_id"], i["bug_id"], i["fix_commit"], i["originating_repo"], now) for i in probe_infos]
+        )
+        conn.commit()
+    finally:
+        conn.close()
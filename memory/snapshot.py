@@ -0,0 +1,297 @@
+"""
+Mergeable snapshots of global memory.
+
+A snapshot is NDJSON (gzip when the path ends in .gz): a header line with
+the exporting node's id, one line per global pattern and one per lineage
+row. Merging is conflict-free and independent of order:
+
+- trigger_count / false_positive_count are per-node grow-only counters; a
+  merge keeps the maximum seen for each (pattern, node) and the pattern's
+  total is this node's own count plus the sum over other nodes
+- pattern metadata comes from the earliest record (created_at, then
+  category and description as tie-breakers); base severity is the highest seen
+- lineage rows are merged as a set union keyed by probe_id; when two rows
+  share a probe_id the earliest wins whole (created_at, then the remaining
+  columns as tie-breakers)
+
+Run maintenance.recalibrate after merging to re-derive severities and scores.
+
+    python -m memory.snapshot export node-a.ndjson.gz
+    python -m memory.snapshot merge node-a.ndjson.gz node-b.ndjson.gz
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+
+from memory.central import get_conn
+from probes.severity import SEVERITY_ORDER
+
+SNAPSHOT_FORMAT = "hexprobe-memory-snapshot"
+SNAPSHOT_VERSION = 1
+DEFAULT_BATCH_SIZE = 5000
+
+_LINEAGE_COLUMNS = ("probe_id", "pattern_id", "bug_id", "fix_commit", "originating_repo", "created_at")
+# Order deciding which of two lineage rows with the same probe_id is kept
+_LINEAGE_ORDER = ("created_at", "pattern_id", "originating_repo", "bug_id", "fix_commit")
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _severity_rank(column):
+    cases = " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(SEVERITY_ORDER))
+    return f"(CASE {column} {cases} ELSE -1 END)"
+
+
+def _precedes(incoming, stored):
+    """
+    SQL condition: the incoming record's metadata wins over the stored one
+    (earliest created_at, then category, then description; NULLs sort first)
+    """
+    def key(alias):
+        prefix = f"{alias}." if alias else ""
+        return ", ".join(f"COALESCE({prefix}{column}, '')" for column in ("created_at", "category", "description"))
+    return f"({key(incoming)}) < ({key(stored)})"
+
+
+def _earliest(a, b):
+    return f"MIN(COALESCE({a}, {b}), COALESCE({b}, {a}))"
+
+
+def node_id(conn=None):
+    """
+    Stable id of this memory node (HEXPROBE_NODE_ID overrides the generated one)
+    """
+    if os.getenv("HEXPROBE_NODE_ID"):
+        return os.environ["HEXPROBE_NODE_ID"]
+    own_conn = conn is None
+    conn = conn or get_conn()
+    try:
+        row = conn.execute("SELECT value FROM memory_meta WHERE key='node_id'").fetchone()
+        if row:
+            return row[0]
+        generated = uuid.uuid4().hex
+        conn.execute("INSERT INTO memory_meta (key, value) VALUES ('node_id', ?)", (generated,))
+        conn.commit()
+        return generated
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def export_snapshot(path):
+    """
+    Stream global memory to a snapshot file. Returns the number of patterns written.
+    """
+    conn = get_conn()
+    try:
+        local = node_id(conn)
+        written = 0
+        with _open(path, "w") as out:
+            out.write(json.dumps({"type": "header", "format": SNAPSHOT_FORMAT,
+                                  "version": SNAPSHOT_VERSION, "node_id": local}) + "\n")
+            rows = conn.execute(
+                "SELECT g.pattern_id, g.category, g.description, COALESCE(g.base_severity, g.severity), "
+                "g.created_at, g.trigger_count, g.false_positive_count, "
+                "c.node_id, c.trigger_count, c.false_positive_count "
+                "FROM global_patterns g LEFT JOIN global_pattern_counters c "
+                "ON c.pattern_id = g.pattern_id AND c.node_id != ? ORDER BY g.pattern_id",
+                (local,),
+            )
+            current = None
+            for pattern_id, category, description, severity, created_at, total, total_fp, node, trig, fp in rows:
+                if current is None or current["pattern_id"] != pattern_id:
+                    if current is not None:
+                        written += _write_pattern(out, current, local)
+                    current = {"type": "pattern", "pattern_id": pattern_id, "category": category,
+                               "description": description, "severity": severity, "created_at": created_at,
+                               "counters": {}, "_total": (total or 0, total_fp or 0)}
+                if node is not None:
+                    current["counters"][node] = [trig or 0, fp or 0]
+            if current is not None:
+                written += _write_pattern(out, current, local)
+
+            for row in conn.execute(f"SELECT {', '.join(_LINEAGE_COLUMNS)} FROM probe_lineage_global"):
+                out.write(json.dumps({"type": "lineage", **dict(zip(_LINEAGE_COLUMNS, row))}) + "\n")
+    finally:
+        conn.close()
+    return written
+
+
+def _write_pattern(out, record, local):
+    total, total_fp = record.pop("_total")
+    remote = record["counters"].values()
+    record["counters"][local] = [max(total - sum(c[0] for c in remote), 0),
+                                 max(total_fp - sum(c[1] for c in remote), 0)]
+    out.write(json.dumps(record) + "\n")
+    return 1
+
+
+def _apply_pattern_batch(conn, patterns, local):
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS incoming_patterns ("
+        "pattern_id TEXT PRIMARY KEY, category TEXT, description TEXT, severity TEXT, created_at TEXT)"
+    )
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS incoming_counters ("
+        "pattern_id TEXT, node_id TEXT, trigger_count INTEGER, false_positive_count INTEGER, "
+        "PRIMARY KEY (pattern_id, node_id))"
+    )
+    conn.execute("DELETE FROM incoming_patterns")
+    conn.execute("DELETE FROM incoming_counters")
+
+    # Collapse duplicates inside the batch with the same rules used against stored rows
+    conn.executemany(
+        "INSERT INTO incoming_patterns (pattern_id, category, description, severity, created_at) VALUES (?,?,?,?,?) "
+        "ON CONFLICT(pattern_id) DO UPDATE SET "
+        f"category = CASE WHEN {_precedes('excluded', None)} THEN excluded.category ELSE category END, "
+        f"description = CASE WHEN {_precedes('excluded', None)} THEN excluded.description ELSE description END, "
+        f"severity = CASE WHEN {_severity_rank('excluded.severity')} > {_severity_rank('severity')} "
+        "THEN excluded.severity ELSE severity END, "
+        f"created_at = {_earliest('created_at', 'excluded.created_at')}",
+        [(p["pattern_id"], p.get("category"), p.get("description"), p.get("severity"), p.get("created_at"))
+         for p in patterns],
+    )
+    conn.executemany(
+        "INSERT INTO incoming_counters (pattern_id, node_id, trigger_count, false_positive_count) VALUES (?,?,?,?) "
+        "ON CONFLICT(pattern_id, node_id) DO UPDATE SET "
+        "trigger_count = MAX(trigger_count, excluded.trigger_count), "
+        "false_positive_count = MAX(false_positive_count, excluded.false_positive_count)",
+        [(p["pattern_id"], node, counts[0], counts[1])
+         for p in patterns for node, counts in p.get("counters", {}).items() if node != local],
+    )
+
+    conn.execute(
+        "INSERT INTO global_patterns (pattern_id, category, description, severity, base_severity, "
+        "trigger_count, false_positive_count, created_at) "
+        "SELECT pattern_id, category, description, severity, severity, 0, 0, created_at FROM incoming_patterns "
+        "WHERE pattern_id NOT IN (SELECT pattern_id FROM global_patterns)"
+    )
+    winner = _precedes("i", "g")
+    merged_severity = (
+        f"CASE WHEN {_severity_rank('i.severity')} > {_severity_rank('COALESCE(g.base_severity, g.severity)')} "
+        "THEN i.severity ELSE COALESCE(g.base_severity, g.severity) END"
+    )
+    conn.execute(
+        "UPDATE global_patterns AS g SET "
+        f"category = CASE WHEN {winner} THEN i.category ELSE g.category END, "
+        f"description = CASE WHEN {winner} THEN i.description ELSE g.description END, "
+        f"base_severity = {merged_severity}, "
+        f"severity = {merged_severity}, "
+        f"created_at = {_earliest('g.created_at', 'i.created_at')} "
+        "FROM incoming_patterns AS i WHERE i.pattern_id = g.pattern_id"
+    )
+    # Grow totals by how much each remote node's counter grew, then store the new maxima
+    conn.execute(
+        "UPDATE global_patterns AS g SET "
+        "trigger_count = g.trigger_count + d.trigger_delta, "
+        "false_positive_count = g.false_positive_count + d.fp_delta "
+        "FROM (SELECT i.pattern_id, "
+        "SUM(MAX(i.trigger_count - COALESCE(c.trigger_count, 0), 0)) AS trigger_delta, "
+        "SUM(MAX(i.false_positive_count - COALESCE(c.false_positive_count, 0), 0)) AS fp_delta "
+        "FROM incoming_counters i LEFT JOIN global_pattern_counters c "
+        "ON c.pattern_id = i.pattern_id AND c.node_id = i.node_id GROUP BY i.pattern_id) AS d "
+        "WHERE d.pattern_id = g.pattern_id"
+    )
+    conn.execute(
+        "INSERT INTO global_pattern_counters (pattern_id, node_id, trigger_count, false_positive_count) "
+        "SELECT pattern_id, node_id, trigger_count, false_positive_count FROM incoming_counters WHERE true "
+        "ON CONFLICT(pattern_id, node_id) DO UPDATE SET "
+        "trigger_count = MAX(trigger_count, excluded.trigger_count), "
+        "false_positive_count = MAX(false_positive_count, excluded.false_positive_count)"
+    )
+    conn.execute("DELETE FROM incoming_patterns")
+    conn.execute("DELETE FROM incoming_counters")
+
+
+def _apply_lineage_batch(conn, lineage):
+    def key(prefix):
+        return ", ".join(f"COALESCE({prefix}{column}, '')" for column in _LINEAGE_ORDER)
+    wins = f"({key('excluded.')}) < ({key('')})"
+    conn.executemany(
+        f"INSERT INTO probe_lineage_global ({', '.join(_LINEAGE_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in _LINEAGE_COLUMNS)}) "
+        "ON CONFLICT(probe_id) DO UPDATE SET "
+        + ", ".join(f"{column} = CASE WHEN {wins} THEN excluded.{column} ELSE {column} END"
+                    for column in _LINEAGE_COLUMNS[1:]),
+        [tuple(row.get(column) for column in _LINEAGE_COLUMNS) for row in lineage],
+    )
+
+
+def merge_snapshot(path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Merge one snapshot into global memory, streaming it in batches.
+    Returns counts of pattern and lineage records read.
+    """
+    conn = get_conn()
+    counts = {"patterns": 0, "lineage": 0}
+    try:
+        local = node_id(conn)
+        patterns, lineage = [], []
+
+        def flush():
+            with conn:
+                if patterns:
+                    _apply_pattern_batch(conn, patterns, local)
+                if lineage:
+                    _apply_lineage_batch(conn, lineage)
+            patterns.clear()
+            lineage.clear()
+
+        with _open(path, "r") as stream:
+            header = json.loads(stream.readline())
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a HexProbe memory snapshot")
+            for line in stream:
+                record = json.loads(line)
+                if record["type"] == "pattern":
+                    patterns.append(record)
+                    counts["patterns"] += 1
+                elif record["type"] == "lineage":
+                    lineage.append(record)
+                    counts["lineage"] += 1
+                if len(patterns) + len(lineage) >= batch_size:
+                    flush()
+        flush()
+    finally:
+        conn.close()
+    return counts
+
+
+def merge_snapshots(paths, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Merge several snapshots; the result does not depend on their order
+    """
+    totals = {"patterns": 0, "lineage": 0}
+    for path in paths:
+        for key, value in merge_snapshot(path, batch_size=batch_size).items():
+            totals[key] += value
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m memory.snapshot", description="Export and merge global memory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a snapshot of this node's global memory")
+    export.add_argument("path")
+    merge = commands.add_parser("merge", help="merge snapshots into this node's global memory")
+    merge.add_argument("paths", nargs="+")
+    merge.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(json.dumps({"patterns": export_snapshot(Path(args.path))}))
+    else:
+        print(json.dumps(merge_snapshots(args.paths, batch_size=args.batch_size)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,25 @@ def generate_probe(pattern, bug_id, fix_commit, repo, artifacts=None):
     Auto-generates a probe from memory/past bugs
     """
     probe_id = str(uuid.uuid4())
-    record_lineage(probe_id, pattern, bug_id, fix_commit, repo)
+    record_lineage(probe_id, pattern["id"], bug_id, fix_commit, repo)
 
     findings = [Finding(category=pattern["category"],
                         severity=pattern["severity"],
                         message=pattern["description"])]
 
     return ProbeResult(findings=[f.__dict__ for f in findings], severity=pattern["severity"])
+
+
+def run(repo, ctx=None, artifacts=None):
+    """
+    Runs the generated probes of all active learned patterns (or of ctx["patterns"])
+    in one batch: a single combined matcher and one pass over the repo (or over ctx["paths"]).
+    ctx["record_lineage"] = False skips lineage writes (watch mode).
+    """
+    from knowledge.learn import active_patterns
+    from probes.generated.batch import run_batch
+
+    patterns = (ctx or {}).get("patterns")
+    if patterns is None:
+        patterns = active_patterns()
+    return run_batch(patterns, repo, paths=(ctx or {}).get("paths"), record=(ctx or {}).get("record_lineage", True))
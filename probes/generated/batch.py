@@ -0,0 +1,203 @@
+"""
+Batch engine for generated probes.
+
+Instead of running one generated probe per learned pattern, every pattern is
+compiled into a single matcher and the repository is read once:
+
+- patterns with a signature (literal source text) are merged into one trie
+  regex, scanned with a lookahead so overlapping signatures are all found;
+  signatures contained in a matched one are credited along with it
+- patterns without a signature have nothing to look for and are skipped
+- each finding carries the id of the pattern that produced it in pattern_id,
+  so the orchestrator credits that pattern instead of learning a new one
+- lineage for every generated probe is written in one transaction, with a
+  stable probe id per (pattern, repo); since that id fixes the row's content,
+  it is only written the first time a process sees it (and the store skips
+  rows it already holds), so repeated runs neither grow nor rewrite it
+"""
+import os
+import re
+import uuid
+from pathlib import Path
+
+from probes.meta import Finding, ProbeResult
+
+# Files larger than this are not scanned
+MAX_SCAN_BYTES = 1024 * 1024
+# Directories never scanned (VCS metadata, caches, virtualenvs, dependencies)
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".tox", ".mypy_cache"}
+_PROBE_NAMESPACE = uuid.UUID("5b0c2f1e-6a43-4d8e-9a47-2f5f4c7f0b11")
+
+# The last compiled matcher, reused while the pattern set is unchanged (daemon, watch mode)
+_compiled = {"key": None, "matcher": None}
+# Generated probe ids whose lineage this process has already written
+_recorded_lineage = set()
+
+
+def probe_id(pattern_id, repo):
+    return str(uuid.uuid5(_PROBE_NAMESPACE, f"{pattern_id}\x1f{repo}"))
+
+
+def _trie_regex(needles):
+    """
+    Regex matching any of needles (bytes), preferring the longest at each position
+    """
+    trie = {}
+    for needle in needles:
+        node = trie
+        for byte in needle:
+            node = node.setdefault(byte, {})
+        node[None] = True
+    return _node_regex(trie)
+
+
+def _node_regex(node):
+    branches = []
+    for byte in sorted(key for key in node if key is not None):
+        run, child = bytearray([byte]), node[byte]
+        # Collapse chains of single-child nodes into one literal
+        while len(child) == 1 and None not in child:
+            (next_byte, child), = child.items()
+            run.append(next_byte)
+        branches.append(re.escape(bytes(run)) + _node_regex(child))
+    if not branches:
+        return b""
+    body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+    if None in node:
+        return b"(?:" + body + b")?"
+    return body
+
+
+def _first(offsets, needle, offset):
+    if needle not in offsets or offset < offsets[needle]:
+        offsets[needle] = offset
+
+
+class PatternMatcher:
+    """
+    All signatures of a set of patterns compiled into one matcher
+    """
+    def __init__(self, patterns):
+        self.by_signature = {}
+        for pattern in patterns:
+            signature = pattern.get("signature")
+            if signature:
+                self.by_signature.setdefault(signature.encode("utf-8"), []).append(pattern)
+        self.regex = None
+        self.contained = {}
+        if self.by_signature:
+            self.regex = re.compile(b"(?=(" + _trie_regex(self.by_signature) + b"))")
+            self._index_contained()
+
+    def _index_contained(self):
+        # The scan reports only the longest signature starting at each position, so
+        # remember which other signatures (with their offsets) each one contains
+        for needle in sorted(self.by_signature, key=len):
+            inner = {}
+            for end in range(1, len(needle)):
+                if needle[:end] in self.by_signature:
+                    inner.setdefault(needle[:end], 0)
+            for match in self.regex.finditer(needle, 1):
+                _first(inner, match.group(1), match.start())
+            for found, offset in list(inner.items()):
+                for nested, nested_offset in self.contained[found].items():
+                    _first(inner, nested, offset + nested_offset)
+            inner.pop(needle, None)
+            self.contained[needle] = inner
+
+    def scan(self, data):
+        """
+        Returns {signature: offset of its first occurrence} for signatures present in data
+        """
+        found = {}
+        if self.regex is None:
+            return found
+        for match in self.regex.finditer(data):
+            needle = match.group(1)
+            if needle in found:
+                continue
+            found[needle] = match.start()
+            for inner, offset in self.contained[needle].items():
+                _first(found, inner, match.start() + offset)
+        return found
+
+
+def compile_patterns(patterns):
+    """
+    PatternMatcher for patterns, reusing the previous one when the patterns have not changed
+    """
+    key = tuple(tuple(sorted(pattern.items())) for pattern in patterns)
+    if _compiled["key"] != key:
+        _compiled["matcher"] = PatternMatcher(patterns)
+        _compiled["key"] = key
+    return _compiled["matcher"]
+
+
+def iter_files(repo, paths=None):
+    """
+    Files to scan: the given paths, or every file under repo outside SKIP_DIRS
+    """
+    if paths is not None:
+        yield from (Path(path) for path in paths)
+        return
+    for root, dirs, files in os.walk(repo):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            yield Path(root) / name
+
+
+def _read(path):
+    try:
+        if path.stat().st_size > MAX_SCAN_BYTES:
+            return None
+        data = path.read_bytes()
+    except OSError:
+        return None
+    # Skip binary files
+    if b"\0" in data[:8192]:
+        return None
+    return data
+
+
+def scan_repo(matcher, repo, paths=None):
+    """
+    One pass over repo; returns finding dicts for every (pattern, file) match
+    """
+    findings = []
+    if matcher.regex is None:
+        return findings
+    for path in iter_files(repo, paths):
+        data = _read(path)
+        if not data:
+            continue
+        for needle, offset in matcher.scan(data).items():
+            line = data.count(b"\n", 0, offset) + 1
+            location = f"{path}:{line}"
+            for pattern in matcher.by_signature[needle]:
+                finding = Finding(pattern["category"], pattern["severity"], pattern["description"], location)
+                findings.append({**finding.__dict__, "pattern_id": pattern["id"]})
+    return findings
+
+
+def run_batch(patterns, repo, paths=None, record=True):
+    """
+    Evaluate the generated probes of all patterns against repo in one pass
+    and record their lineage in bulk
+    """
+    from knowledge.lineage import record_lineages
+
+    patterns = [p for p in patterns if p.get("signature")]
+    matcher = compile_patterns(patterns)
+    findings = scan_repo(matcher, repo, paths)
+    if record:
+        lineages = [{"probe_id": probe_id(p["id"], str(repo)), "pattern_id": p["id"], "originating_repo": str(repo)}
+                    for p in patterns]
+        lineages = [row for row in lineages if row["probe_id"] not in _recorded_lineage]
+        if lineages:
+            record_lineages(lineages)
+            _recorded_lineage.update(row["probe_id"] for row in lineages)
+
+    severity_order = ["info","low","medium","high","critical"]
+    severity = max([f["severity"] for f in findings if f["severity"] in severity_order], default="info",
+                   key=lambda s: severity_order.index(s))
+    return ProbeResult(findings=findings, severity=severity)
@@ -6,6 +6,7 @@ class Finding:
     severity: str
     message: str
     location: str = None
+    rule: str = None
 
 @dataclass
 class ProbeResult:
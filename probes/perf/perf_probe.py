@@ -5,7 +5,9 @@ def run(repo, ctx=None, artifacts=None):
     """
     Performance regression probe using external load tests
     """
-    baseline = artifacts.get("perf_baseline") if artifacts else {"p95": 100, "p99":200, "error_rate":0}
+    default_baseline = {"p95": 100, "p99":200, "error_rate":0}
+    stored_baseline = artifacts.get("perf_baseline") if artifacts else None
+    baseline = stored_baseline or default_baseline
     proc = subprocess.run(["k6","run","load.js","--summary-export=summary.json"], cwd=repo, capture_output=True, text=True)
     
     try:
@@ -15,6 +17,9 @@ def run(repo, ctx=None, artifacts=None):
             "p99": summary["metrics"]["http_req_duration"]["p(99)"],
             "error_rate": summary["metrics"]["http_req_failed"]["rate"]
         }
+        if artifacts and stored_baseline is None:
+            # First measured run for this repo becomes its baseline
+            artifacts.store("perf_baseline", current)
     except Exception:
         current = baseline
 
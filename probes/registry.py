@@ -0,0 +1,65 @@
+import importlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProbeDefinition:
+    key: str
+    name: str
+    description: str
+    stage: str
+
+    @property
+    def func(self):
+        """
+        The probe's run function, imported on first access
+        """
+        return load_probe(self.stage)
+
+
+PROBES = [
+    ProbeDefinition(
+        key="static.surface_sweep",
+        name="Static Surface Sweep",
+        description="Scan for lint, type, and boundary input risks.",
+        stage="probes.static.surface_sweep",
+    ),
+    ProbeDefinition(
+        key="fuzz.fuzz_probe",
+        name="Fuzz Probe",
+        description="Run fuzzing scripts to detect crashes and memory safety issues.",
+        stage="probes.fuzz.fuzz_probe",
+    ),
+    ProbeDefinition(
+        key="perf.perf_probe",
+        name="Performance Probe",
+        description="Compare load test metrics against a baseline.",
+        stage="probes.perf.perf_probe",
+    ),
+    ProbeDefinition(
+        key="perf.chaos",
+        name="Chaos Probe",
+        description="Simulate service disruptions and report failures.",
+        stage="probes.perf.chaos",
+    ),
+]
+
+_loaded = {}
+
+
+def get_probe(key):
+    for probe in PROBES:
+        if probe.key == key:
+            return probe
+    return None
+
+
+def load_probe(name):
+    """
+    Import a probe module lazily and return its run function.
+    Accepts a registry key ("static.surface_sweep") or a stage path ("probes.static.surface_sweep").
+    """
+    stage = name if name.startswith("probes.") else f"probes.{name}"
+    if stage not in _loaded:
+        _loaded[stage] = importlib.import_module(stage).run
+    return _loaded[stage]
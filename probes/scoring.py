@@ -1,3 +1,8 @@
 def probe_score(meta):
     return meta.trigger_count*3 - meta.false_positive_count*5 + (50 if meta.status=="core" else 0)
 
+def probe_score_sql(trigger_count="trigger_count", false_positive_count="false_positive_count", status="status"):
+    """
+    SQL expression equivalent to probe_score over table columns
+    """
+    return f"({trigger_count}*3 - {false_positive_count}*5 + (CASE WHEN {status}='core' THEN 50 ELSE 0 END))"
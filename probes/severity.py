@@ -8,3 +8,15 @@ def adjust_severity(meta):
         idx = max(idx-1, 0)
     meta.severity = SEVERITY_ORDER[idx]
     return meta
+
+def adjust_severity_sql(severity="severity", trigger_count="trigger_count", false_positive_count="false_positive_count"):
+    """
+    SQL expression applying the adjust_severity rules to table columns.
+    Severities outside SEVERITY_ORDER are left unchanged.
+    """
+    to_idx = " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(SEVERITY_ORDER))
+    idx = f"(CASE {severity} {to_idx} END)"
+    raised = f"MIN({idx} + ({trigger_count} >= 5 AND {false_positive_count} <= 1), {len(SEVERITY_ORDER)-1})"
+    adjusted = f"MAX({raised} - ({false_positive_count} >= 3), 0)"
+    from_idx = " ".join(f"WHEN {i} THEN '{s}'" for i, s in enumerate(SEVERITY_ORDER))
+    return f"(CASE WHEN {idx} IS NULL THEN {severity} ELSE (CASE {adjusted} {from_idx} END) END)"
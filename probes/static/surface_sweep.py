@@ -1,25 +1,120 @@
+import json
+import re
 import subprocess
+import tempfile
 from probes.meta import Finding, ProbeResult
 from pathlib import Path
 
+from probes.static.toolstate import mypy_command, ruff_command
+
+# Per-tool cap on findings; the remainder is counted in one summary finding
+MAX_TOOL_FINDINGS = 5000
+# Cap on raw tool output kept when a tool fails without parseable issues
+MAX_TOOL_ERROR_CHARS = 2000
+
+# "path:line:col: error: message  [code]" (mypy text output, used when JSON output is unavailable)
+MYPY_TEXT_LINE = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+):(?:(?P<column>\d+):)? (?P<severity>error|warning|note): "
+    r"(?P<message>.*?)(?:  \[(?P<code>[\w-]+)\])?$"
+)
+
+
+def _location(path, line, column=None):
+    if column is None:
+        return f"{path}:{line}"
+    return f"{path}:{line}:{column}"
+
+
+def parse_ruff_line(line):
+    """
+    Parse one line of `ruff check --output-format=json-lines` into a Finding
+    """
+    try:
+        issue = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(issue, dict):
+        return None
+    location = issue.get("location") or {}
+    return Finding("lint", "medium", issue.get("message", ""),
+                   _location(issue.get("filename"), location.get("row"), location.get("column")),
+                   issue.get("code"))
+
+
+def parse_mypy_line(line):
+    """
+    Parse one line of `mypy --output json` (or classic text output) into a Finding
+    """
+    try:
+        issue = json.loads(line)
+    except ValueError:
+        match = MYPY_TEXT_LINE.match(line.rstrip("\n"))
+        if not match:
+            return None
+        issue = {"file": match["file"], "line": int(match["line"]),
+                 "column": int(match["column"]) if match["column"] else None,
+                 "severity": match["severity"], "message": match["message"], "code": match["code"]}
+    if not isinstance(issue, dict) or issue.get("severity") == "note":
+        return None
+    return Finding("type", "high", issue.get("message", ""),
+                   _location(issue.get("file"), issue.get("line"), issue.get("column")),
+                   issue.get("code"))
+
+
+def stream_tool_findings(cmd, parse_line, category, severity, max_findings=MAX_TOOL_FINDINGS):
+    """
+    Run an analysis tool and parse its stdout incrementally into per-issue findings.
+    Issues beyond max_findings are only counted, in a single summary finding.
+    """
+    findings = []
+    dropped = 0
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        try:
+            for line in proc.stdout:
+                finding = parse_line(line)
+                if finding is None:
+                    continue
+                if len(findings) < max_findings:
+                    findings.append(finding)
+                else:
+                    dropped += 1
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
+        if proc.returncode != 0 and not findings:
+            stderr.seek(0)
+            output = stderr.read(MAX_TOOL_ERROR_CHARS)
+            findings.append(Finding(category, severity, f"{cmd[0]} failed: {output}".strip()))
+
+    if dropped:
+        findings.append(Finding(category, severity,
+                                f"{dropped} additional {cmd[0]} issues not shown (limit {max_findings})"))
+    return findings
+
+
 def run(repo, ctx=None, artifacts=None):
     """
-    Static analysis probe for linting, type checking, and boundary input detection
+    Static analysis probe for linting, type checking, and boundary input detection.
+    With ctx["paths"], only those files are checked (watch mode).
     """
     findings = []
+    paths = (ctx or {}).get("paths")
+    targets = None
+    if paths is not None:
+        targets = [str(path) for path in paths if str(path).endswith(".py") and Path(path).is_file()]
+        if not targets:
+            return ProbeResult(findings=[], severity="info")
 
     # Lint check (ruff)
-    lint = subprocess.run(["ruff", repo], capture_output=True, text=True)
-    if lint.returncode != 0:
-        findings.append(Finding("lint","medium",lint.stdout))
+    findings.extend(stream_tool_findings(ruff_command(repo, targets), parse_ruff_line, "lint", "medium"))
 
-    # Type checking (mypy)
-    mypy = subprocess.run(["mypy", repo], capture_output=True, text=True)
-    if mypy.returncode != 0:
-        findings.append(Finding("type","high",mypy.stdout))
+    # Type checking (mypy, via a per-repo dmypy daemon when available)
+    findings.extend(stream_tool_findings(mypy_command(repo, targets), parse_mypy_line, "type", "high"))
 
     # Boundary heuristic
-    for path in Path(repo).rglob("*.py"):
+    for path in (Path(target) for target in targets) if targets is not None else Path(repo).rglob("*.py"):
         if "input(" in path.read_text(errors="ignore"):
             findings.append(Finding("boundary","high","Unvalidated input",str(path)))
 
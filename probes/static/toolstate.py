@@ -0,0 +1,108 @@
+"""
+Per-repository state for the static analysis tools used by surface_sweep.
+
+Each audited repository gets a directory under ``<data dir>/tools`` holding
+its ruff and mypy caches and the status file of its mypy daemon (dmypy), so
+repeated sweeps run warm and nothing is written into the target repo.
+"""
+import functools
+import hashlib
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from core.storage import get_data_dir
+
+# dmypy shuts itself down after this many idle seconds
+DMYPY_IDLE_TIMEOUT = 1800
+# Tool caches untouched for this long are removed by evict_idle_tools
+STALE_CACHE_DAYS = 14
+
+# First mypy release with `--output json`; older ones get classic text output
+MYPY_JSON_VERSION = (1, 11)
+
+_LAST_USED = "last_used"
+_DMYPY_STATUS = "dmypy.json"
+
+
+def tools_root() -> Path:
+    return get_data_dir() / "tools"
+
+
+def repo_state_dir(repo) -> Path:
+    """
+    Return (and mark as used) the tool state directory for repo
+    """
+    resolved = str(Path(repo).resolve())
+    state_dir = tools_root() / hashlib.sha1(resolved.encode("utf-8")).hexdigest()[:16]
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / "repo").write_text(resolved, encoding="utf-8")
+    (state_dir / _LAST_USED).touch()
+    return state_dir
+
+
+def ruff_command(repo, targets=None):
+    state_dir = repo_state_dir(repo)
+    return ["ruff", "check", "--output-format=json-lines",
+            "--cache-dir", str(state_dir / "ruff_cache"), *(targets or [repo])]
+
+
+@functools.lru_cache(maxsize=None)
+def mypy_supports_json():
+    """
+    Whether the installed mypy accepts `--output json` (checked once per process)
+    """
+    try:
+        output = subprocess.run(["mypy", "--version"], capture_output=True, text=True, timeout=60).stdout
+    except (OSError, subprocess.SubprocessError):
+        return False
+    match = re.search(r"(\d+)\.(\d+)", output)
+    return bool(match) and (int(match[1]), int(match[2])) >= MYPY_JSON_VERSION
+
+
+def mypy_command(repo, targets=None):
+    """
+    dmypy when available (warm incremental checks), otherwise plain mypy; both share a per-repo cache.
+    JSON output is requested only from mypy versions that support it.
+    """
+    state_dir = repo_state_dir(repo)
+    output_flags = ["--output", "json"] if mypy_supports_json() else []
+    mypy_flags = ["--cache-dir", str(state_dir / "mypy_cache"), *output_flags, *(targets or [repo])]
+    if shutil.which("dmypy"):
+        return ["dmypy", "--status-file", str(state_dir / _DMYPY_STATUS),
+                "run", "--timeout", str(DMYPY_IDLE_TIMEOUT), "--", *mypy_flags]
+    return ["mypy", *mypy_flags]
+
+
+def stop_daemon(state_dir):
+    status_file = Path(state_dir) / _DMYPY_STATUS
+    if not status_file.exists() or not shutil.which("dmypy"):
+        return False
+    subprocess.run(["dmypy", "--status-file", str(status_file), "stop"],
+                   capture_output=True, timeout=60)
+    return True
+
+
+def evict_idle_tools(max_idle_seconds=DMYPY_IDLE_TIMEOUT, max_cache_age_days=STALE_CACHE_DAYS):
+    """
+    Stop daemons of repos idle longer than max_idle_seconds and delete tool
+    state untouched for max_cache_age_days. Returns the number of directories removed.
+    """
+    root = tools_root()
+    if not root.exists():
+        return 0
+    now = time.time()
+    removed = 0
+    for state_dir in root.iterdir():
+        if not state_dir.is_dir():
+            continue
+        marker = state_dir / _LAST_USED
+        idle = now - (marker.stat().st_mtime if marker.exists() else 0)
+        if idle > max_idle_seconds:
+            stop_daemon(state_dir)
+        if idle > max_cache_age_days * 86400:
+            shutil.rmtree(state_dir, ignore_errors=True)
+            removed += 1
+    return removed
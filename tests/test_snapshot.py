@@ -0,0 +1,63 @@
+import json
+
+from memory.central import get_conn
+from memory.snapshot import SNAPSHOT_FORMAT, SNAPSHOT_VERSION, merge_snapshot
+
+
+def _write_snapshot(path, node, patterns, lineage):
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(json.dumps({"type": "header", "format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION,
+                              "node_id": node}) + "\n")
+        for record in patterns:
+            out.write(json.dumps({"type": "pattern", **record}) + "\n")
+        for record in lineage:
+            out.write(json.dumps({"type": "lineage", **record}) + "\n")
+
+
+def _merged(monkeypatch, data_dir, snapshots):
+    monkeypatch.setenv("HEXPROBE_DATA_DIR", str(data_dir))
+    for snapshot in snapshots:
+        merge_snapshot(snapshot)
+    conn = get_conn()
+    try:
+        lineage = conn.execute("SELECT * FROM probe_lineage_global ORDER BY probe_id").fetchall()
+        patterns = conn.execute(
+            "SELECT pattern_id, category, description, severity, trigger_count, false_positive_count, created_at "
+            "FROM global_patterns ORDER BY pattern_id"
+        ).fetchall()
+    finally:
+        conn.close()
+    return lineage, patterns
+
+
+def test_merge_is_independent_of_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("HEXPROBE_NODE_ID", "local")
+    a, b = tmp_path / "a.ndjson", tmp_path / "b.ndjson"
+    _write_snapshot(a, "node-a", [
+        {"pattern_id": "p1", "category": "security", "description": "pickle use", "severity": "high",
+         "created_at": "2024-02-01T00:00:00", "counters": {"node-a": [3, 1]}},
+    ], [
+        {"probe_id": "probe-1", "pattern_id": "p1", "bug_id": None, "fix_commit": None,
+         "originating_repo": "/repo", "created_at": "2024-02-01T00:00:00"},
+        {"probe_id": "probe-2", "pattern_id": "p2", "bug_id": "bug-a", "fix_commit": None,
+         "originating_repo": "/repo", "created_at": "2024-03-01T00:00:00"},
+    ])
+    _write_snapshot(b, "node-b", [
+        {"pattern_id": "p1", "category": "boundary", "description": "pickle loads", "severity": "critical",
+         "created_at": "2024-01-01T00:00:00", "counters": {"node-b": [2, 0]}},
+    ], [
+        {"probe_id": "probe-1", "pattern_id": "p1", "bug_id": None, "fix_commit": "abc123",
+         "originating_repo": "/repo", "created_at": "2024-01-15T00:00:00"},
+        {"probe_id": "probe-2", "pattern_id": "p2", "bug_id": "bug-b", "fix_commit": None,
+         "originating_repo": "/repo", "created_at": "2024-03-01T00:00:00"},
+    ])
+
+    forward = _merged(monkeypatch, tmp_path / "forward", [a, b])
+    backward = _merged(monkeypatch, tmp_path / "backward", [b, a])
+
+    assert forward == backward
+    lineage, patterns = forward
+    # Earliest row wins; equal created_at falls back to the remaining columns
+    assert lineage[0][3] == "abc123" and lineage[0][5] == "2024-01-15T00:00:00"
+    assert lineage[1][2] == "bug-a"
+    assert patterns == [("p1", "boundary", "pickle loads", "critical", 5, 1, "2024-01-01T00:00:00")]